@@ -0,0 +1,77 @@
+"""
+Content-addressed upload storage
+- Files are stored under their SHA-256 in a sharded tree: <root>/ab/cd/abcd....pdf
+- Identical uploads are stored once
+- Optional gzip compression, kept only when it actually saves space
+- DB rows store the blob key "<sha256><ext>", which resolves to the file on disk
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+
+from config import settings
+
+GZIP_SUFFIX = ".gz"
+
+
+class BlobStore:
+    def __init__(self, root: str, shard_depth: int = 2, compress: bool = False):
+        self.root = root
+        self.shard_depth = shard_depth
+        self.compress = compress
+        os.makedirs(root, exist_ok=True)
+
+    def _shard_dir(self, digest: str) -> str:
+        shards = [digest[i * 2:i * 2 + 2] for i in range(self.shard_depth)]
+        return os.path.join(self.root, *shards)
+
+    def path(self, key: str) -> str:
+        """Path of the stored blob for a key."""
+        if "/" in key or os.path.sep in key:
+            # Rows written before content addressing hold the flat upload path
+            return key
+        base = os.path.join(self._shard_dir(key), key)
+        if os.path.exists(base + GZIP_SUFFIX):
+            return base + GZIP_SUFFIX
+        return base
+
+    def put(self, data: bytes, ext: str) -> str:
+        """Store the bytes (once per distinct content) and return the blob key."""
+        digest = hashlib.sha256(data).hexdigest()
+        key = f"{digest}{ext}"
+        directory = self._shard_dir(digest)
+        target = os.path.join(directory, key)
+        if os.path.exists(target) or os.path.exists(target + GZIP_SUFFIX):
+            return key
+
+        payload = data
+        if self.compress:
+            compressed = gzip.compress(data, compresslevel=6, mtime=0)
+            # PDFs and DOCX are often already compressed; only keep gzip when it pays off
+            if len(compressed) < len(data) * 0.9:
+                payload = compressed
+                target += GZIP_SUFFIX
+
+        os.makedirs(directory, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def get(self, key: str) -> bytes:
+        path = self.path(key)
+        with open(path, "rb") as f:
+            data = f.read()
+        return gzip.decompress(data) if path.endswith(GZIP_SUFFIX) else data
+
+
+resume_store = BlobStore("resume_uploads", settings.UPLOAD_SHARD_DEPTH, settings.UPLOAD_COMPRESS)
+jd_store = BlobStore("jd_uploads", settings.UPLOAD_SHARD_DEPTH, settings.UPLOAD_COMPRESS)
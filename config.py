@@ -10,6 +10,60 @@ class Settings:
     DB_PASSWORD: str = os.getenv("DB_PASSWORD", "YourPassword")
     DB_PORT: int = int(os.getenv("DB_PORT", "1433"))
     DB_DRIVER: str = os.getenv("DB_DRIVER", "{ODBC Driver 17 for SQL Server}") # Adjust driver as needed
+    DB_BACKEND: str = os.getenv("DB_BACKEND", "mssql") # "sqlite" uses a local stand-in (load testing)
+    DB_SQLITE_PATH: str = os.getenv("DB_SQLITE_PATH", "loadtest.sqlite3")
+    DB_ASYNC_POOL_SIZE: int = int(os.getenv("DB_ASYNC_POOL_SIZE", "16")) # threads (and connections) serving async endpoints
+
+    # /resume_matcher result cache
+    MATCH_CACHE_PATH: str = os.getenv("MATCH_CACHE_PATH", "cache/match_cache.sqlite3")
+    MATCH_CACHE_MAX_ENTRIES: int = int(os.getenv("MATCH_CACHE_MAX_ENTRIES", "5000"))
+    MATCH_CACHE_TTL_SECONDS: int = int(os.getenv("MATCH_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+    # Gemini call layer: per-attempt timeout, overall deadline, retries, hedging, circuit breaker
+    GEMINI_BASE_URL: str = os.getenv("GEMINI_BASE_URL", "") # e.g. the load-test fake Gemini server
+    GEMINI_TIMEOUT_SECONDS: float = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
+    GEMINI_DEADLINE_SECONDS: float = float(os.getenv("GEMINI_DEADLINE_SECONDS", "120"))
+    GEMINI_MAX_RETRIES: int = int(os.getenv("GEMINI_MAX_RETRIES", "3"))
+    GEMINI_BACKOFF_BASE_SECONDS: float = float(os.getenv("GEMINI_BACKOFF_BASE_SECONDS", "0.5"))
+    GEMINI_BACKOFF_MAX_SECONDS: float = float(os.getenv("GEMINI_BACKOFF_MAX_SECONDS", "8"))
+    GEMINI_HEDGE_PERCENTILE: float = float(os.getenv("GEMINI_HEDGE_PERCENTILE", "95")) # 0 disables hedging
+    GEMINI_HEDGE_MIN_SAMPLES: int = int(os.getenv("GEMINI_HEDGE_MIN_SAMPLES", "20"))
+    GEMINI_LATENCY_WINDOW: int = int(os.getenv("GEMINI_LATENCY_WINDOW", "200"))
+    GEMINI_MAX_CONCURRENCY: int = int(os.getenv("GEMINI_MAX_CONCURRENCY", "32"))
+    GEMINI_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("GEMINI_BREAKER_FAILURE_THRESHOLD", "5"))
+    GEMINI_BREAKER_RESET_SECONDS: float = float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "30"))
+
+    # Near-duplicate resume detection (MinHash + LSH)
+    DEDUPE_NUM_PERM: int = int(os.getenv("DEDUPE_NUM_PERM", "128"))
+    DEDUPE_BANDS: int = int(os.getenv("DEDUPE_BANDS", "16"))
+    DEDUPE_SHINGLE_SIZE: int = int(os.getenv("DEDUPE_SHINGLE_SIZE", "3"))
+    DEDUPE_THRESHOLD: float = float(os.getenv("DEDUPE_THRESHOLD", "0.8"))
+
+    # BM25 search: how often each worker checks the database for rows indexed elsewhere
+    SEARCH_REFRESH_SECONDS: float = float(os.getenv("SEARCH_REFRESH_SECONDS", "5"))
+    # How long an id skipped during a refresh (insert not yet committed elsewhere) keeps being re-checked
+    INDEX_REFRESH_GRACE_SECONDS: float = float(os.getenv("INDEX_REFRESH_GRACE_SECONDS", "120"))
+
+    # Top-k resume ranking: skill tier weights, and the share of a skill's weight given to its single terms
+    RANK_PRIMARY_WEIGHT: float = float(os.getenv("RANK_PRIMARY_WEIGHT", "3"))
+    RANK_SECONDARY_WEIGHT: float = float(os.getenv("RANK_SECONDARY_WEIGHT", "2"))
+    RANK_TERTIARY_WEIGHT: float = float(os.getenv("RANK_TERTIARY_WEIGHT", "1"))
+    RANK_TERM_WEIGHT: float = float(os.getenv("RANK_TERM_WEIGHT", "0.5"))
+    # Rows added since the last CSR build are scored from a small tail matrix until they exceed this share
+    RANK_REBUILD_FRACTION: float = float(os.getenv("RANK_REBUILD_FRACTION", "0.1"))
+
+    # Content-addressed upload storage
+    UPLOAD_SHARD_DEPTH: int = int(os.getenv("UPLOAD_SHARD_DEPTH", "2"))
+    UPLOAD_COMPRESS: bool = os.getenv("UPLOAD_COMPRESS", "false").lower() in ("1", "true", "yes")
+
+    # Sandboxed document extraction workers
+    SANDBOX_WORKERS: int = int(os.getenv("SANDBOX_WORKERS", "4"))
+    SANDBOX_MAX_JOBS_PER_WORKER: int = int(os.getenv("SANDBOX_MAX_JOBS_PER_WORKER", "50"))
+    SANDBOX_CPU_SECONDS: int = int(os.getenv("SANDBOX_CPU_SECONDS", "20"))
+    SANDBOX_TIMEOUT_SECONDS: float = float(os.getenv("SANDBOX_TIMEOUT_SECONDS", "30"))
+    SANDBOX_MEMORY_MB: int = int(os.getenv("SANDBOX_MEMORY_MB", "512"))
+    SANDBOX_MAX_PAGES: int = int(os.getenv("SANDBOX_MAX_PAGES", "50"))
+    SANDBOX_MAX_FILE_MB: int = int(os.getenv("SANDBOX_MAX_FILE_MB", "20"))
 
 settings = Settings()
 
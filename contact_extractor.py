@@ -0,0 +1,165 @@
+"""
+Local rule-based extraction for deterministic resume fields
+- email, phone, github_link, linkedin_link via compiled patterns
+- candidate skills matched against a known vocabulary; skills that are also
+  ordinary English words only count with their exact casing, in a list-like line
+- a phone number only overrides the LLM when it is labelled (or starts with +)
+- Everything is collected in a single pass over the text
+"""
+import re
+from collections import deque
+from typing import Dict, List
+
+# Fields that are filled locally and can be dropped from the LLM schema when found
+LOCAL_FIELDS = ("email", "phone", "github_link", "linkedin_link")
+
+# Known skill vocabulary (display names). Ambiguous one-letter / common-word
+# languages such as C, R and Go are left to the LLM.
+SKILL_VOCABULARY = [
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Kotlin", "Swift", "Scala",
+    "Ruby", "PHP", "Rust", "Golang", "MATLAB", "Perl", "Bash", "PowerShell",
+    "SQL", "T-SQL", "PL/SQL", "MySQL", "PostgreSQL", "SQL Server", "Oracle", "SQLite",
+    "MongoDB", "Redis", "Cassandra", "Elasticsearch", "DynamoDB", "Snowflake",
+    "HTML", "CSS", "React", "Angular", "Vue.js", "Node.js", "Express.js", "Next.js",
+    "Django", "Flask", "FastAPI", "Spring Boot", "ASP.NET", ".NET", "Laravel",
+    "REST API", "GraphQL", "gRPC", "Microservices",
+    "AWS", "Azure", "GCP", "Google Cloud", "Docker", "Kubernetes", "Terraform", "Ansible",
+    "Jenkins", "Git", "GitHub Actions", "CI/CD", "Linux",
+    "Machine Learning", "Deep Learning", "NLP", "Computer Vision", "Data Science",
+    "TensorFlow", "PyTorch", "Keras", "scikit-learn", "Pandas", "NumPy", "Spark", "Hadoop",
+    "Kafka", "Airflow", "Power BI", "Tableau", "Excel",
+    "Selenium", "JUnit", "PyTest", "Jira", "Agile", "Scrum",
+]
+
+# Vocabulary entries that are also everyday words or names ("I excel at", "react
+# quickly"): matched case-sensitively, and only on lines that read like a list
+AMBIGUOUS_SKILLS = {
+    "Excel", "React", "Spark", "Swift", "Agile", "Scrum", "Oracle", "Rust", "Ruby",
+    "Flask", "Pandas", "Jenkins", "Kafka", "Selenium", "Cassandra", "Bash", "Angular",
+    "Scala", "Tableau", "Terraform", "Snowflake", "Airflow",
+}
+
+_LIST_CONTEXT_RE = re.compile(r"[,|;•·▪●\t]|^\s*[-*]\s|\bskills?\b", re.IGNORECASE)
+_PHONE_LABEL_RE = re.compile(r"\b(?:phone|mobile|mob|cell|tel|telephone|contact|ph|whatsapp)\b", re.IGNORECASE)
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<email>[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,})
+    |(?P<github>(?:https?://)?(?:www\.)?github\.com/[A-Za-z0-9_.-]+)
+    |(?P<linkedin>(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/in/[A-Za-z0-9_%-]+/?)
+    |(?P<phone>(?<![\w.])\+?\(?\d[\d \t().-]{7,}\d)
+    |(?P<word>[A-Za-z.][A-Za-z0-9+#./-]*)
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+def _normalize_word(word: str) -> str:
+    return word.lower().rstrip(".,/-")
+
+
+def _build_skill_index(vocabulary: List[str]):
+    index = {}
+    for skill in vocabulary:
+        key = tuple(_normalize_word(part) for part in skill.split())
+        index[key] = skill
+    return index, max(len(key) for key in index)
+
+
+_SKILL_INDEX, _MAX_SKILL_WORDS = _build_skill_index(SKILL_VOCABULARY)
+
+
+def _split_word(word: str) -> List[str]:
+    # "Python/Django" lists two skills, "CI/CD" is one
+    if (_normalize_word(word),) in _SKILL_INDEX or "/" not in word:
+        return [word]
+    return word.split("/")
+
+
+def extract_local_fields(text: str) -> Dict:
+    """
+    Scan the text once and return the deterministic fields that were found,
+    plus any vocabulary skills (in order of first appearance). An unlabelled
+    phone-like number is returned as "phone_guess", used only as a fallback.
+    """
+    found = {}
+    skills = []
+    seen_skills = set()
+    window = deque(maxlen=_MAX_SKILL_WORDS)
+
+    for line in text.splitlines():
+        window.clear()
+        line_skills = []  # (skill, ambiguous)
+        list_like = False
+
+        for match in _TOKEN_RE.finditer(line):
+            kind = match.lastgroup
+            value = match.group(kind)
+
+            if kind == "word":
+                for raw in _split_word(value.rstrip(".,/-")):
+                    part = _normalize_word(raw)
+                    if not part:
+                        continue
+                    window.append(part)
+                    # Check every multi-word suffix ending at this word, e.g. "spring boot"
+                    words = tuple(window)
+                    for size in range(1, len(words) + 1):
+                        skill = _SKILL_INDEX.get(words[-size:])
+                        if not skill:
+                            continue
+                        ambiguous = skill in AMBIGUOUS_SKILLS
+                        if ambiguous and raw not in (skill, skill.upper()):
+                            continue
+                        line_skills.append((skill, ambiguous))
+                        list_like = list_like or not ambiguous
+                continue
+
+            window.clear()
+            if kind == "email":
+                found.setdefault("email", value)
+            elif kind == "github":
+                found.setdefault("github_link", value.rstrip("."))
+            elif kind == "linkedin":
+                found.setdefault("linkedin_link", value.rstrip("/"))
+            elif kind == "phone":
+                digits = sum(ch.isdigit() for ch in value)
+                # Filters out year ranges, dates and other short numbers
+                if 10 <= digits <= 15:
+                    value = value.strip()
+                    labelled = value.startswith("+") or _PHONE_LABEL_RE.search(line, 0, match.start())
+                    found.setdefault("phone" if labelled else "phone_guess", value)
+
+        list_like = list_like or bool(_LIST_CONTEXT_RE.search(line))
+        for skill, ambiguous in line_skills:
+            if ambiguous and not list_like:
+                continue
+            if skill not in seen_skills:
+                seen_skills.add(skill)
+                skills.append(skill)
+
+    found["skills"] = skills
+    return found
+
+
+def merge_local_fields(ai_data: Dict, local_fields: Dict) -> Dict:
+    """
+    Merge locally extracted fields into the LLM result. Local values win for
+    deterministic fields; an unlabelled phone only fills a gap the LLM left;
+    skills are the union of both lists.
+    """
+    merged = dict(ai_data or {})
+    for field in LOCAL_FIELDS:
+        if local_fields.get(field):
+            merged[field] = local_fields[field]
+    if not merged.get("phone") and local_fields.get("phone_guess"):
+        merged["phone"] = local_fields["phone_guess"]
+
+    skills = list(merged.get("skills") or [])
+    known = {s.lower() for s in skills}
+    for skill in local_fields.get("skills", []):
+        if skill.lower() not in known:
+            known.add(skill.lower())
+            skills.append(skill)
+    merged["skills"] = skills
+    return merged
@@ -1,9 +1,39 @@
 from fastapi import Depends
-import pyodbc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import functools
 import os
+import re
+import sqlite3
+import threading
+import time
 
 from config import settings
 
+try:
+    import pyodbc
+except ImportError:  # only needed for the SQL Server backend
+    pyodbc = None
+
+_OUTPUT_INSERTED_RE = re.compile(r"OUTPUT\s+INSERTED\.(\w+)\s+(VALUES\s*\([^)]*\))", re.IGNORECASE)
+
+
+def get_sqlite_connection():
+    """
+    Local SQLite stand-in for SQL Server (DB_BACKEND=sqlite), used for offline
+    load testing. GETDATE() is provided as a SQL function.
+    """
+    conn = sqlite3.connect(settings.DB_SQLITE_PATH, timeout=30)
+    conn.create_function("GETDATE", 0, lambda: datetime.now().isoformat(sep=" ", timespec="seconds"))
+    return conn
+
+
+def prepare_query(query: str) -> str:
+    """Rewrite the few T-SQL constructs we use into SQLite syntax when running on SQLite."""
+    if settings.DB_BACKEND != "sqlite":
+        return query
+    return _OUTPUT_INSERTED_RE.sub(r"\2 RETURNING \1", query)
 
 
 def get_db_connection():
@@ -11,6 +41,11 @@ def get_db_connection():
     Establishes a connection to the MSSQL database and yields the connection object.
     Ensures the connection is closed after use.
     """
+    if settings.DB_BACKEND == "sqlite":
+        return get_sqlite_connection()
+    if pyodbc is None:
+        raise RuntimeError("pyodbc is required for the SQL Server backend")
+
     conn = None
     try:
         conn_str = (
@@ -32,18 +67,84 @@ def get_db_connection():
 
             
             
+class IdWatermark:
+    """
+    Incremental-load cursor over an IDENTITY column that several workers insert into.
+
+    Ids are handed out at insert time but rows only become visible at commit, so
+    a lower id can appear after a higher one has already been loaded. Ids skipped
+    over are remembered as gaps and re-checked until they show up or are older
+    than grace_seconds (rolled-back inserts and IDENTITY jumps never fill in).
+    """
+
+    MAX_GAPS = 64
+
+    def __init__(self, grace_seconds: float):
+        self.grace_seconds = grace_seconds
+        self.last_id = 0
+        self._gaps = []  # [first_id, last_id, first_seen] ranges not loaded yet
+
+    def predicate(self, column: str):
+        """SQL condition and params matching the rows still to load."""
+        cutoff = time.monotonic() - self.grace_seconds
+        self._gaps = [gap for gap in self._gaps if gap[2] >= cutoff]
+        clauses = [f"{column} > ?"]
+        params = [self.last_id]
+        for first, last, _ in self._gaps:
+            clauses.append(f"{column} BETWEEN ? AND ?")
+            params += [first, last]
+        return "(" + " OR ".join(clauses) + ")", tuple(params)
+
+    def mark_loaded(self, row_id: int):
+        """Record a loaded id; call in ascending id order within a batch."""
+        if row_id > self.last_id:
+            if row_id > self.last_id + 1:
+                self._gaps.append([self.last_id + 1, row_id - 1, time.monotonic()])
+                # Keep the highest gaps: only recent ids can still be in flight
+                del self._gaps[:-self.MAX_GAPS]
+            self.last_id = row_id
+            return
+        for gap in self._gaps:
+            first, last, seen = gap
+            if first <= row_id <= last:
+                self._gaps.remove(gap)
+                if first < row_id:
+                    self._gaps.append([first, row_id - 1, seen])
+                if row_id < last:
+                    self._gaps.append([row_id + 1, last, seen])
+                self._gaps.sort()
+                return
+
+
+def _fetch(conn, query: str, params: tuple = None, fetch_one=False):
+    cursor = conn.cursor()
+    cursor.execute(prepare_query(query), params if params else ())
+    if fetch_one :
+        return cursor.fetchone()
+    else:
+        return cursor.fetchall()
+
+def _non_query(conn, query: str, params: tuple = None):
+    cursor = conn.cursor()
+    cursor.execute(prepare_query(query), params if params else ())
+    conn.commit()
+    return cursor.rowcount # Returns number of rows affected
+
+def _insert(conn, query: str, params: tuple = None):
+    cursor = conn.cursor()
+    cursor.execute(prepare_query(query), params if params else ())
+    row = cursor.fetchone()
+    conn.commit()
+    return row[0] if row else None
+
+
 def execute_query( query: str, params: tuple = None,fetch_one=False):
     """
     Executes a SQL query and returns the results.
     """
     connection  = get_db_connection()
     try:
-        cursor = connection.cursor()
-        cursor.execute(query, params if params else ())
-        if fetch_one :
-            return cursor.fetchone()
-        else:
-            return cursor.fetchall()
+        return _fetch(connection, query, params, fetch_one)
     finally:
         if connection:
             connection.close()
@@ -54,10 +155,71 @@ def execute_non_query( query: str, params: tuple = None):
     """
     conn = get_db_connection()
     try: 
-        cursor = conn.cursor()
-        cursor.execute(query, params if params else ())
-        conn.commit()
-        return cursor.rowcount # Returns number of rows affected
+        return _non_query(conn, query, params)
     finally:
         if conn:
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+def execute_insert( query: str, params: tuple = None):
+    """
+    Executes an INSERT with an OUTPUT INSERTED.<column> clause and returns the
+    value of that column for the new row (e.g. its IDENTITY id).
+    """
+    conn = get_db_connection()
+    try:
+        return _insert(conn, query, params)
+    finally:
+        if conn:
+            conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Async access for `async def` endpoints
+# ---------------------------------------------------------------------------
+# Blocking driver calls run on a dedicated, bounded executor so they never
+# block the event loop and never compete with FastAPI's shared threadpool.
+# Each executor thread keeps one open connection, so the executor doubles as
+# a connection pool of DB_ASYNC_POOL_SIZE connections.
+
+_db_executor = ThreadPoolExecutor(max_workers=settings.DB_ASYNC_POOL_SIZE, thread_name_prefix="db")
+_db_local = threading.local()
+
+
+def _pooled_call(fn, query: str, params: tuple, *args):
+    conn = getattr(_db_local, "conn", None)
+    if conn is None:
+        conn = get_db_connection()
+        _db_local.conn = conn
+    try:
+        result = fn(conn, query, params, *args)
+        # End the implicit read transaction so the kept-open connection holds no snapshot
+        conn.commit()
+        return result
+    except Exception:
+        # Connection state is unknown (dropped link, aborted transaction); reconnect next time
+        _db_local.conn = None
+        try:
+            conn.close()
+        except Exception:
+            pass
+        raise
+
+
+async def _run_pooled(fn, query: str, params: tuple, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, functools.partial(_pooled_call, fn, query, params, *args))
+
+
+async def execute_query_async(query: str, params: tuple = None, fetch_one=False):
+    """Async execute_query: runs on the DB executor and returns the same rows."""
+    return await _run_pooled(_fetch, query, params, fetch_one)
+
+
+async def execute_non_query_async(query: str, params: tuple = None):
+    """Async execute_non_query: returns the number of rows affected."""
+    return await _run_pooled(_non_query, query, params)
+
+
+async def execute_insert_async(query: str, params: tuple = None):
+    """Async execute_insert: returns the OUTPUT INSERTED.<column> value."""
+    return await _run_pooled(_insert, query, params)
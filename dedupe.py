@@ -0,0 +1,178 @@
+"""
+Near-duplicate resume detection (MinHash + LSH)
+- MinHash signature of the resume text is computed at insert time and stored
+  in the resume_minhash table
+- Signatures are banded into an in-memory LSH index, so a new resume is only
+  compared against resumes sharing at least one band bucket
+- Duplicate clusters are built from bucket collisions above the similarity threshold
+"""
+import hashlib
+import random
+import re
+import struct
+import threading
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from database import IdWatermark, execute_non_query, execute_query
+from config import settings
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_WORD_RE = re.compile(r"\w+")
+
+
+class MinHasher:
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        # Fixed seed so signatures stay comparable across processes and restarts
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(num_perm)
+        ]
+
+    def _shingle_hashes(self, text: str) -> Set[int]:
+        words = _WORD_RE.findall(text.lower())
+        size = self.shingle_size
+        if len(words) < size:
+            shingles = [" ".join(words)] if words else []
+        else:
+            shingles = (" ".join(words[i:i + size]) for i in range(len(words) - size + 1))
+        return {
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+            for s in shingles
+        }
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashes = self._shingle_hashes(text)
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def to_bytes(self, signature: Tuple[int, ...]) -> bytes:
+        return struct.pack(f"<{self.num_perm}I", *signature)
+
+    def from_bytes(self, data: bytes) -> Tuple[int, ...]:
+        return struct.unpack(f"<{self.num_perm}I", data)
+
+
+def estimate_similarity(sig_a: Tuple[int, ...], sig_b: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity: fraction of matching MinHash slots."""
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+class LSHIndex:
+    def __init__(self, bands: int, rows: int):
+        self.bands = bands
+        self.rows = rows
+        self.buckets: Dict[Tuple[int, Tuple[int, ...]], Set[int]] = defaultdict(set)
+        self.signatures: Dict[int, Tuple[int, ...]] = {}
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield band, signature[start:start + self.rows]
+
+    def add(self, key: int, signature: Tuple[int, ...]):
+        self.signatures[key] = signature
+        for band_key in self._band_keys(signature):
+            self.buckets[band_key].add(key)
+
+    def candidates(self, signature: Tuple[int, ...]) -> Set[int]:
+        found = set()
+        for band_key in self._band_keys(signature):
+            found.update(self.buckets.get(band_key, ()))
+        return found
+
+
+class DuplicateDetector:
+    def __init__(self, num_perm: int, bands: int, shingle_size: int, threshold: float):
+        if num_perm % bands:
+            raise ValueError("DEDUPE_NUM_PERM must be divisible by DEDUPE_BANDS")
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size)
+        self.index = LSHIndex(bands, num_perm // bands)
+        self._lock = threading.Lock()
+        self._watermark = IdWatermark(settings.INDEX_REFRESH_GRACE_SECONDS)
+
+    def _refresh(self):
+        """Pull signatures stored by other workers since the last refresh."""
+        where, params = self._watermark.predicate("resume_id")
+        rows = execute_query(
+            f"SELECT resume_id, signature FROM resume_minhash WHERE {where} ORDER BY resume_id", params
+        )
+        for resume_id, data in rows or []:
+            if resume_id not in self.index.signatures:
+                self.index.add(resume_id, self.hasher.from_bytes(bytes(data)))
+            self._watermark.mark_loaded(resume_id)
+
+    def _matches(self, signature, candidates) -> List[Tuple[int, float]]:
+        scored = []
+        for other in candidates:
+            similarity = estimate_similarity(signature, self.index.signatures[other])
+            if similarity >= self.threshold:
+                scored.append((other, similarity))
+        return sorted(scored, key=lambda item: item[1], reverse=True)
+
+    def check_and_add(self, resume_id: int, text: str) -> List[int]:
+        """
+        Store the signature for a newly inserted resume and return the ids of
+        existing resumes that are near-duplicates of it (most similar first).
+        """
+        signature = self.hasher.signature(text)
+        execute_non_query(
+            "INSERT INTO resume_minhash (resume_id, signature) VALUES (?, ?)",
+            (resume_id, self.hasher.to_bytes(signature)),
+        )
+        with self._lock:
+            self._refresh()
+            candidates = self.index.candidates(signature)
+            candidates.discard(resume_id)
+            matches = self._matches(signature, candidates)
+            self.index.add(resume_id, signature)
+        return [other for other, _ in matches]
+
+    def clusters(self) -> List[List[int]]:
+        """Groups of resume ids that are near-duplicates of each other."""
+        with self._lock:
+            self._refresh()
+            parent = {}
+
+            def find(x):
+                while parent.get(x, x) != x:
+                    parent[x] = parent.get(parent[x], parent[x])
+                    x = parent[x]
+                return x
+
+            checked = set()
+            for members in self.index.buckets.values():
+                if len(members) < 2:
+                    continue
+                ordered = sorted(members)
+                for i, a in enumerate(ordered):
+                    for b in ordered[i + 1:]:
+                        if (a, b) in checked:
+                            continue
+                        checked.add((a, b))
+                        parent.setdefault(a, a)
+                        parent.setdefault(b, b)
+                        if estimate_similarity(self.index.signatures[a], self.index.signatures[b]) >= self.threshold:
+                            parent[find(b)] = find(a)
+
+            groups = defaultdict(list)
+            for member in parent:
+                groups[find(member)].append(member)
+            return sorted((sorted(g) for g in groups.values() if len(g) > 1), key=lambda g: g[0])
+
+
+duplicate_detector = DuplicateDetector(
+    settings.DEDUPE_NUM_PERM,
+    settings.DEDUPE_BANDS,
+    settings.DEDUPE_SHINGLE_SIZE,
+    settings.DEDUPE_THRESHOLD,
+)
@@ -0,0 +1,95 @@
+"""
+Streaming DOCX text extraction
+- Reads word/document.xml straight from the zip archive
+- Incremental XML parsing; processed elements are dropped as we go, so memory
+  stays bounded regardless of document size
+- Emits paragraph text and table rows (cells joined with " | ") in document order
+"""
+import zipfile
+from typing import Iterator
+from xml.etree.ElementTree import iterparse
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC_NS = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+W_P = W_NS + "p"
+W_T = W_NS + "t"
+W_TAB = W_NS + "tab"
+W_BR = W_NS + "br"
+W_CR = W_NS + "cr"
+W_TR = W_NS + "tr"
+W_TC = W_NS + "tc"
+MC_FALLBACK = MC_NS + "Fallback"
+
+
+def iter_docx_text(file_path) -> Iterator[str]:
+    """Yield the non-empty text blocks of a DOCX file in document order."""
+    with zipfile.ZipFile(file_path) as archive:
+        with archive.open("word/document.xml") as xml_file:
+            yield from _iter_document_xml(xml_file)
+
+
+def _iter_document_xml(xml_file) -> Iterator[str]:
+    elements = []      # currently open elements, used to detach finished children
+    paragraphs = []    # text runs of open paragraphs (text boxes nest paragraphs)
+    cells = []         # paragraph texts of open table cells
+    rows = []          # cell texts of open table rows
+    fallback_depth = 0  # mc:Fallback repeats the mc:Choice content, skip it
+
+    for event, elem in iterparse(xml_file, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            elements.append(elem)
+            if tag == MC_FALLBACK:
+                fallback_depth += 1
+            elif fallback_depth:
+                pass
+            elif tag == W_P:
+                paragraphs.append([])
+            elif tag == W_TC:
+                cells.append([])
+            elif tag == W_TR:
+                rows.append([])
+            continue
+
+        elements.pop()
+        if tag == MC_FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth:
+            pass
+        elif tag == W_T:
+            if paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+        elif tag == W_TAB:
+            if paragraphs:
+                paragraphs[-1].append("\t")
+        elif tag in (W_BR, W_CR):
+            if paragraphs:
+                paragraphs[-1].append("\n")
+        elif tag == W_P:
+            text = "".join(paragraphs.pop()).strip()
+            if text:
+                if paragraphs:
+                    # Text box paragraph inside a run of the enclosing paragraph
+                    paragraphs[-1].append(f" {text} ")
+                elif cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+        elif tag == W_TC:
+            cell = "\n".join(cells.pop())
+            if rows:
+                rows[-1].append(cell)
+        elif tag == W_TR:
+            line = " | ".join(cell for cell in rows.pop() if cell)
+            if line:
+                # Rows of a table nested in a cell stay inside that cell
+                if cells:
+                    cells[-1].append(line)
+                else:
+                    yield line
+
+        # Drop the finished element so the tree never grows
+        elem.clear()
+        if elements:
+            elements[-1].remove(elem)
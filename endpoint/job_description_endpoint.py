@@ -5,30 +5,35 @@ Job Description Upload & Processing Endpoint
 - Calls Gemini API for key detail extraction
 - Stores results in SQL Server
 """
-from google import genai
 from google.genai.types import GenerateContentConfig
 import os
-import uuid
 import json
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends, Query
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from typing import List
 from pydantic import BaseModel
-from database import execute_non_query
+from database import execute_insert
 from config import settings
-import pdfplumber
+from blob_storage import jd_store
+import gemini_client
+from match_cache import match_cache
+from search_index import jd_index
+from ranking import resume_ranker
 
 # PDF & DOCX extraction
-from pypdf import PdfReader
-from docx import Document
+from extraction_sandbox import extract_text, read_upload, read_upload_async
 
 # Gemini API (placeholder)
 import requests
 
 router = APIRouter()
 
-UPLOAD_DIR = "jd_uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
+
+# Model and prompt version used by /resume_matcher; bump the prompt version
+# whenever the matcher prompt changes so stale cached results are not reused.
+MATCH_MODEL = "gemini-2.5-flash"
+MATCH_PROMPT_VERSION = "1"
 
 class JobDescription(BaseModel):
     job_title: str
@@ -41,25 +46,21 @@ class JobDescription(BaseModel):
     primary_skills: List[str] = []
     secondary_skills: List[str] = []
     tertiary_skills: List[str] = []
-    jd_file_path: str = None
+    jd_file_path: str = None  # blob key of the stored file
 
-# Helper: Extract text from PDF
-def extract_pdf_text(file_path):
-    try:
-        reader = PdfReader(file_path)
-        text = "\n".join(page.extract_text() or "" for page in reader.pages)
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"PDF extraction failed: {str(e)}")
 
-# Helper: Extract text from DOCX
-def extract_docx_text(file_path):
-    try:
-        doc = Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"DOCX extraction failed: {str(e)}")
+class RankedResume(BaseModel):
+    resume_id: int
+    name: str
+    score: float
+
+# Helper: Extract text from PDF (in a sandboxed worker process)
+def extract_pdf_text(data: bytes, engine: str = "pypdf"):
+    return extract_text(data, ".pdf", engine)
+
+# Helper: Extract text from DOCX (in a sandboxed worker process)
+def extract_docx_text(data: bytes):
+    return extract_text(data, ".docx")
 
 # Helper: Call Gemini API
     
@@ -87,12 +88,7 @@ Extract the following details from this job description text. Respond ONLY with
 """
    
     try:
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="GEMINI_API_KEY not set in environment variables.")
-
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
+        response = gemini_client.generate_content(
             model="gemini-2.5-flash",
             config=GenerateContentConfig(
                 system_instruction=["answer should based on given context ", context],
@@ -103,6 +99,8 @@ Extract the following details from this job description text. Respond ONLY with
         )
         generated_answer = parse_response(response)
         return generated_answer
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Gemini API error: {str(e)}")
     
@@ -111,13 +109,14 @@ Extract the following details from this job description text. Respond ONLY with
 
 
 # Helper: Insert JD into SQL Server
-def insert_job_description(jd: JobDescription):
+def insert_job_description(jd: JobDescription, jd_text: str) -> int:
+    """Insert the JD with its extracted text, index it for search and return its new id."""
     query = """
     INSERT INTO job_descriptions (
         job_title, company_name, location, experience_required,
         qualifications, responsibilities, employment_type,
-        primary_skills, secondary_skills, tertiary_skills, jd_file_path
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        primary_skills, secondary_skills, tertiary_skills, jd_file_path, jd_text
+    ) OUTPUT INSERTED.id VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
     params = (
         jd.job_title,
@@ -130,12 +129,16 @@ def insert_job_description(jd: JobDescription):
         json.dumps(jd.primary_skills),
         json.dumps(jd.secondary_skills),
         json.dumps(jd.tertiary_skills),
-        jd.jd_file_path
+        jd.jd_file_path,
+        jd_text,
     )
     try:
-        execute_non_query(query, params)
+        jd_id = execute_insert(query, params)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database insert error: {str(e)}")
+    skills = " ".join(jd.primary_skills + jd.secondary_skills + jd.tertiary_skills)
+    jd_index.add(jd_id, {"title": jd.job_title, "skills": skills, "text": jd_text}, jd.job_title)
+    return jd_id
 
 @router.post("/upload-jd", response_model=JobDescription, status_code=201)
 def upload_job_description(file: UploadFile = File(...)):
@@ -144,20 +147,19 @@ def upload_job_description(file: UploadFile = File(...)):
     if ext not in [".pdf", ".docx"]:
         raise HTTPException(status_code=400, detail="Unsupported file type. Only PDF and DOCX allowed.")
 
-    # Save file with unique name
-    unique_name = f"{uuid.uuid4()}{ext}"
-    file_path = os.path.join(UPLOAD_DIR, unique_name)
+    # Save file under its content hash (identical uploads are stored once);
+    # oversized files are rejected before anything is stored
+    data = read_upload(file.file)
     try:
-        with open(file_path, "wb") as f:
-            f.write(file.file.read())
+        file_key = jd_store.put(data, ext)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File save error: {str(e)}")
 
     # Extract text
     if ext == ".pdf":
-        jd_text = extract_pdf_text(file_path)
+        jd_text = extract_pdf_text(data)
     else:
-        jd_text = extract_docx_text(file_path)
+        jd_text = extract_docx_text(data)
     if not jd_text:
         raise HTTPException(status_code=400, detail="No text extracted from file.")
 
@@ -167,21 +169,21 @@ def upload_job_description(file: UploadFile = File(...)):
         raise HTTPException(status_code=422, detail="AI did not return required job details.")
 
     # Build JD object
-    jd = JobDescription(**ai_data, jd_file_path=file_path)
+    jd = JobDescription(**ai_data, jd_file_path=file_key)
 
     # Insert into DB
-    insert_job_description(jd)
+    insert_job_description(jd, jd_text)
 
     return jd
 
 
 @router.get("/jd", response_model=List[JobDescription])
-def get_all_jd():
+async def get_all_jd():
     """Get all job description details from the database."""
     query = "SELECT job_title,company_name,location,experience_required,qualifications,responsibilities,employment_type,primary_skills,secondary_skills,tertiary_skills,jd_file_path from job_descriptions"
     try:
-        from database import execute_query
-        rows = execute_query(query)
+        from database import execute_query_async
+        rows = await execute_query_async(query)
         jds = []
         for row in rows:
             jds.append(JobDescription(
@@ -200,39 +202,39 @@ def get_all_jd():
         return jds
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
-    
-    
-
-
 
 
-@router.post("/resume_matcher/")
-async def create_upload_file(resume: UploadFile,jd: UploadFile):
-        # ... file processing logic ...
-    with pdfplumber.open(resume.file) as pdf:
-        pages = pdf.pages
-        resume_text = ""
-
-        for page in pages:
-            resume_text += page.extract_text()
-            
-    with pdfplumber.open(jd.file) as pdf:
-        pages = pdf.pages
-        jd_text = ""
+@router.get("/jd/{jd_id}/top-resumes", response_model=List[RankedResume])
+def get_top_resumes(jd_id: int, k: int = Query(20, ge=1, le=500)):
+    """Rank every stored resume against a stored JD by weighted skill coverage."""
+    query = "SELECT primary_skills, secondary_skills, tertiary_skills FROM job_descriptions WHERE id = ?"
+    try:
+        from database import execute_query
+        row = execute_query(query, (jd_id,), fetch_one=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    if not row:
+        raise HTTPException(status_code=404, detail="Job description not found")
+
+    tiers = {
+        "primary": json.loads(row[0]) if row[0] else [],
+        "secondary": json.loads(row[1]) if row[1] else [],
+        "tertiary": json.loads(row[2]) if row[2] else [],
+    }
+    try:
+        ranked = resume_ranker.top_k(tiers, k)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Ranking error: {str(e)}")
+    return [RankedResume(resume_id=rid, name=name, score=score) for rid, name, score in ranked]
+    
+    
 
-        for page in pages:
-            jd_text += page.extract_text()
 
-    try:
-        # Initialize the Gemini client with the API key from environment variables
-        # Ensure GEMINI_API_KEY is set in your environment
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(status_code=500, detail="GEMINI_API_KEY not set in environment variables.")
 
-        client = genai.Client(api_key=api_key)
 
-        context = """
+# Helper: Build the Gemini request for matching a resume against a JD
+def build_match_request(resume_text: str, jd_text: str) -> dict:
+    context = """
         I have given resume and job description, your work is to match the resume with jd,
         
         consider following points while matching and match one by one and see all skills dont forget anything 
@@ -248,12 +250,12 @@ async def create_upload_file(resume: UploadFile,jd: UploadFile):
         and read jd and resume properly
         provide the output in structaral way with json format
         """
-        context_2 ="""
+    context_2 ="""
         You are an AI assistant specialized in resume and job description analysis.
         Your task is to compare a job description with a resume and provide a detailed assessment.
         """
         
-        prompt=f"""
+    prompt=f"""
         ---
         Job Description:
         {jd_text}
@@ -266,19 +268,125 @@ async def create_upload_file(resume: UploadFile,jd: UploadFile):
 
         
         """
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            config=GenerateContentConfig(
-                system_instruction=[context],
-               response_mime_type="application/json",
-                #esponse_json_schema=Qa.model_json_schema()
-            ),
-            contents=[prompt],
+    return dict(
+        model=MATCH_MODEL,
+        config=GenerateContentConfig(
+            system_instruction=[context],
+           response_mime_type="application/json",
+            #esponse_json_schema=Qa.model_json_schema()
+        ),
+        contents=[prompt],
+    )
+
+
+@router.post("/resume_matcher/")
+async def create_upload_file(resume: UploadFile,jd: UploadFile):
+    resume_bytes = await read_upload_async(resume)
+    jd_bytes = await read_upload_async(jd)
+
+    # Repeat matches of the same resume/JD pair are served from the cache.
+    # Hashing, the cache's SQLite I/O, extraction and the Gemini call (with its
+    # retries and backoff) all block, so they run off the event loop.
+    cache_key = await run_in_threadpool(match_cache.make_key, resume_bytes, jd_bytes, MATCH_MODEL, MATCH_PROMPT_VERSION)
+    cached = await run_in_threadpool(match_cache.get, cache_key)
+    if cached is not None:
+        return cached
+
+    resume_text = await run_in_threadpool(extract_pdf_text, resume_bytes, "pdfplumber")
+    jd_text = await run_in_threadpool(extract_pdf_text, jd_bytes, "pdfplumber")
+
+    try:
+        response = await run_in_threadpool(
+            gemini_client.generate_content, **build_match_request(resume_text, jd_text)
         )
-        return  parse_response(response)
+        result = parse_response(response)
+        await run_in_threadpool(match_cache.set, cache_key, result)
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         # Handle any exceptions during the process
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}") 
+
+
+# Helper: Format one server-sent event
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/resume_matcher/stream")
+async def stream_match(resume: UploadFile, jd: UploadFile):
+    """
+    Streaming /resume_matcher/ over server-sent events:
+    - "status" events as the request moves through extraction and generation
+    - "chunk" events with the model's output as it is generated ({"text": ...})
+    - one final "result" event with the parsed, validated JSON
+    - or one final "error" event ({"status_code": ..., "detail": ...})
+    """
+    resume_bytes = await read_upload_async(resume)
+    jd_bytes = await read_upload_async(jd)
+
+    async def events():
+        # First byte goes out before any slow work starts
+        yield sse_event("status", {"stage": "received"})
+        stream = None
+        try:
+            cache_key = await run_in_threadpool(
+                match_cache.make_key, resume_bytes, jd_bytes, MATCH_MODEL, MATCH_PROMPT_VERSION
+            )
+            cached = await run_in_threadpool(match_cache.get, cache_key)
+            if cached is not None:
+                yield sse_event("result", cached)
+                return
+
+            yield sse_event("status", {"stage": "extracting"})
+            resume_text = await run_in_threadpool(extract_pdf_text, resume_bytes, "pdfplumber")
+            jd_text = await run_in_threadpool(extract_pdf_text, jd_bytes, "pdfplumber")
+
+            yield sse_event("status", {"stage": "matching"})
+            parts = []
+            stream = gemini_client.generate_content_stream(**build_match_request(resume_text, jd_text))
+            async for chunk in iterate_in_threadpool(stream):
+                if chunk.text:
+                    parts.append(chunk.text)
+                    yield sse_event("chunk", {"text": chunk.text})
+
+            text = "".join(parts)
+            try:
+                result = json.loads(text)
+            except json.JSONDecodeError as json_e:
+                raise HTTPException(
+                    status_code=500,
+                    detail=f"Model response could not be parsed as JSON. Raw text: '{text}'. Error: {json_e}"
+                )
+            if not isinstance(result, dict):
+                raise HTTPException(status_code=500, detail="Model response is not a JSON object.")
+            await run_in_threadpool(match_cache.set, cache_key, result)
+            yield sse_event("result", result)
+        except HTTPException as e:
+            yield sse_event("error", {"status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            yield sse_event("error", {"status_code": 500, "detail": f"Internal server error: {e}"})
+        finally:
+            # Client gone mid-stream: close the upstream call so it frees its breaker slot and connection
+            if stream is not None:
+                try:
+                    stream.close()
+                except ValueError:
+                    pass  # mid-step in the threadpool; the generator is closed when that step returns and it is released
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # Keep proxies (nginx) from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/resume_matcher/cache-stats")
+def get_match_cache_stats():
+    """Hit/miss statistics for the /resume_matcher result cache."""
+    return match_cache.stats()
           
     
     
@@ -6,31 +6,31 @@ Job Description Upload & Processing Endpoint
 - Stores results in SQL Server
 """
 
-from database import execute_non_query
-from google import genai
+from database import execute_insert
 from google.genai.types import GenerateContentConfig
 import os
-import uuid
 import json
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends
 from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from pydantic import BaseModel
-import pdfplumber
 from config import settings
+from blob_storage import resume_store
+import gemini_client
+from dedupe import duplicate_detector
+from search_index import resume_index
+from ranking import resume_ranker
+from contact_extractor import LOCAL_FIELDS, extract_local_fields, merge_local_fields
 
 # PDF & DOCX extraction
-from pypdf import PdfReader
-from docx import Document
+from extraction_sandbox import extract_text, read_upload, read_upload_async
 
 # Gemini API (placeholder)
 import requests
 
 router = APIRouter()
 
-UPLOAD_DIR = "resume_uploads"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 
 class res(BaseModel):
     question: str
@@ -50,81 +50,89 @@ class resume(BaseModel):
     experience_year:int
     github_link: str
     linkedin_link: str
+    duplicate_of: List[int] = []  # ids of near-duplicate resumes, set on upload
 
 
-# Helper: Extract text from PDF
-def extract_pdf_text(file_path):
-    try:
-        reader = PdfReader(file_path)
-        text = "\n".join(page.extract_text() or "" for page in reader.pages)
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"PDF extraction failed: {str(e)}")
+# Helper: Extract text from PDF (in a sandboxed worker process)
+def extract_pdf_text(data: bytes, engine: str = "pypdf"):
+    return extract_text(data, ".pdf", engine)
 
 
-# Helper: Extract text from DOCX
-def extract_docx_text(file_path):
-    try:
-        doc = Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text.strip()
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"DOCX extraction failed: {str(e)}")
+# Helper: Extract text from DOCX (in a sandboxed worker process)
+def extract_docx_text(data: bytes):
+    return extract_text(data, ".docx")
+
+
+# Fields filled in by the server, never asked from Gemini
+SERVER_FIELDS = ("id", "duplicate_of")
+
+# Field hints used in the Gemini prompt
+RESUME_FIELD_HINTS = {
+    "name": "str",
+    "location": "str",
+    "education": "list",
+    "skills": "list",
+    "email": "str",
+    "phone": "str",
+    "experience": "list",
+    "worked_company": "str",
+    "experience_year": "int",
+    "github_link": "str",
+    "linkedin_link": "str",
+}
+
+
+def llm_resume_schema(skip_fields):
+    """resume JSON schema without the fields that were already extracted locally."""
+    schema = resume.model_json_schema()
+    for field in (*SERVER_FIELDS, *skip_fields):
+        schema["properties"].pop(field, None)
+    schema["required"] = [f for f in schema.get("required", []) if f in schema["properties"]]
+    return schema
 
 
 def call_gemini_api(resume_text: str):
-    # Placeholder: Replace with actual Gemini API endpoint and key
+    # Deterministic fields (email, phone, links) are pulled out locally, so
+    # Gemini is only asked for the remaining fields
+    local_fields = extract_local_fields(resume_text)
+    skip_fields = [f for f in LOCAL_FIELDS if local_fields.get(f)]
+    schema_lines = ",\n".join(
+        f"  '{field}': {hint}" for field, hint in RESUME_FIELD_HINTS.items() if field not in skip_fields
+    )
 
     context = f"""
 Extract the following details from this resume text. Respond ONLY with a valid JSON object matching this schema:
 {{
-  'name': str,
-  'location': str,
-  'education': list,
-  'skills': list,
-  'email': str,
-  'phone': list,
-   'experience' :List,
-   'worked_company' : str,
-   'experience_year':int,
-    'github_link' :str,
-    'linkedin_link' :str
-    
-  
+{schema_lines}
 }}
 
 """
     try:
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="GEMINI_API_KEY not set in environment variables.",
-            )
-
-        client = genai.Client(api_key=api_key)
-        response = client.models.generate_content(
+        response = gemini_client.generate_content(
             model="gemini-2.5-flash",
             config=GenerateContentConfig(
                 system_instruction=["answer should based on given context ", context],
                 response_mime_type="application/json",
-                response_json_schema=resume.model_json_schema(),
+                response_json_schema=llm_resume_schema(skip_fields),
             ),
             contents=resume_text,
         )
         generated_answer = parse_response(response)
-        return generated_answer
+        # Local values fill in anything the model dropped or got wrong
+        return merge_local_fields(generated_answer, local_fields)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Gemini API error: {str(e)}")
 
 
 # Helper: Insert JD into SQL Server
-def insert_resume(rs: resume):
-
+def insert_resume(rs: resume, resume_text: str, file_key: str) -> int:
+    """Insert the resume with its extracted text, index it for search and return its new id."""
     query = """
     INSERT INTO resume_checker  (
-        name,location,education ,skills,email,phone,experience,worked_company,experience_year,github_link,linkedin_link
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        name,location,education ,skills,email,phone,experience,worked_company,experience_year,github_link,linkedin_link,resume_text,file_key
+    ) OUTPUT INSERTED.id VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     """
     params = (
         rs.name,
@@ -138,11 +146,16 @@ def insert_resume(rs: resume):
         rs.experience_year,
         rs.github_link,
         rs.linkedin_link,
+        resume_text,
+        file_key,
     )
     try:
-        execute_non_query(query, params)
+        resume_id = execute_insert(query, params)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database insert error: {str(e)}")
+    resume_index.add(resume_id, {"name": rs.name, "skills": " ".join(rs.skills), "text": resume_text}, rs.name)
+    resume_ranker.add(resume_id, rs.skills, rs.name)
+    return resume_id
 
 
 @router.post("/upload-resume", response_model=resume, status_code=201)
@@ -154,20 +167,19 @@ def upload_resume(file: UploadFile = File(...)):
             status_code=400, detail="Unsupported file type. Only PDF and DOCX allowed."
         )
 
-    # Save file with unique name
-    unique_name = f"{uuid.uuid4()}{ext}"
-    file_path = os.path.join(UPLOAD_DIR, unique_name)
+    # Save file under its content hash (identical uploads are stored once);
+    # oversized files are rejected before anything is stored
+    data = read_upload(file.file)
     try:
-        with open(file_path, "wb") as f:
-            f.write(file.file.read())
+        file_key = resume_store.put(data, ext)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File save error: {str(e)}")
 
     # Extract text
     if ext == ".pdf":
-        resume_text = extract_pdf_text(file_path)
+        resume_text = extract_pdf_text(data)
     else:
-        resume_text = extract_docx_text(file_path)
+        resume_text = extract_docx_text(data)
     if not resume_text:
         raise HTTPException(status_code=400, detail="No text extracted from file.")
 
@@ -179,36 +191,29 @@ def upload_resume(file: UploadFile = File(...)):
         )
 
     # Build JD object
-    rs = resume(**ai_data, jd_file_path=file_path)
+    rs = resume(**ai_data)
 
     # Insert into DB
-    insert_resume(rs)
+    rs.id = insert_resume(rs, resume_text, file_key)
+
+    # Flag near-duplicates of resumes already in the corpus. The resume is
+    # already stored, so a failure here must not turn into an error (a client
+    # retry would store it twice); it is logged and the upload still succeeds.
+    try:
+        rs.duplicate_of = duplicate_detector.check_and_add(rs.id, resume_text)
+    except Exception as e:
+        print(f"Duplicate detection failed for resume {rs.id}: {e}")
+        rs.duplicate_of = []
 
     return rs
 
 
 @router.post("/resume_detials/")
 async def resume_detials(resume: UploadFile,):
-    # ... file processing logic ...
-    with pdfplumber.open(resume.file) as pdf:
-        pages = pdf.pages
-        resume_text = ""
-
-        for page in pages:
-            resume_text += page.extract_text()
+    # Extraction and the Gemini call (with its retries and backoff) block, so they run off the event loop
+    resume_text = await run_in_threadpool(extract_pdf_text, await read_upload_async(resume), "pdfplumber")
 
     try:
-        # Initialize the Gemini client with the API key from environment variables
-        # Ensure GEMINI_API_KEY is set in your environment
-        api_key = os.environ.get("GEMINI_API_KEY")
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="GEMINI_API_KEY not set in environment variables.",
-            )
-
-        client = genai.Client(api_key=api_key)
-
         context = "I have given resume i need all details in resume"
 
         prompt = f"""
@@ -220,7 +225,8 @@ async def resume_detials(resume: UploadFile,):
 
         
         """
-        response = client.models.generate_content(
+        response = await run_in_threadpool(
+            gemini_client.generate_content,
             model="gemini-2.5-flash",
             config=GenerateContentConfig(
                 system_instruction=[context],
@@ -230,6 +236,8 @@ async def resume_detials(resume: UploadFile,):
             contents=[prompt],
         )
         return parse_response(response)
+    except HTTPException:
+        raise
     except Exception as e:
         # Handle any exceptions during the process
         raise HTTPException(status_code=500, detail=f"Internal server error: {e}")
@@ -254,12 +262,12 @@ def parse_response(response):
 
 
 @router.get("/resumes", response_model=List[resume])
-def get_all_resumes():
+async def get_all_resumes():
     """Get all resume details from the database."""
     query = "SELECT id,name, location, education, skills, email, phone, experience, worked_company, experience_year, github_link, linkedin_link FROM resume_checker"
     try:
-        from database import execute_query
-        rows = execute_query(query)
+        from database import execute_query_async
+        rows = await execute_query_async(query)
         resumes = []
         for row in rows:
             resumes.append(resume(
@@ -279,3 +287,12 @@ def get_all_resumes():
         return resumes
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+
+@router.get("/resumes/duplicates", response_model=List[List[int]])
+def get_duplicate_resumes():
+    """Clusters of near-duplicate resume ids."""
+    try:
+        return duplicate_detector.clusters()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
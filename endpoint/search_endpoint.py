@@ -0,0 +1,67 @@
+"""
+Full-text Search Endpoint
+- Ranked BM25 search over stored resume and JD text
+- Optional per-field boosts, e.g. boosts=skills:4,text:1
+"""
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel
+
+from search_index import jd_index, resume_index
+
+router = APIRouter()
+
+
+class SearchHit(BaseModel):
+    id: int
+    label: str
+    score: float
+
+
+def parse_boosts(boosts: Optional[str], fields) -> Dict[str, float]:
+    """Parse "field:weight,field:weight" into a dict, validating field names."""
+    if not boosts:
+        return {}
+    parsed = {}
+    for item in boosts.split(","):
+        field, _, weight = item.partition(":")
+        field = field.strip()
+        if field not in fields:
+            raise HTTPException(
+                status_code=400, detail=f"Unknown boost field '{field}'. Allowed: {', '.join(fields)}"
+            )
+        try:
+            parsed[field] = float(weight)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid boost weight for '{field}': '{weight}'")
+    return parsed
+
+
+def run_search(index, q: str, boosts: Optional[str], limit: int) -> List[SearchHit]:
+    weights = parse_boosts(boosts, index.index.fields)
+    try:
+        hits = index.search(q, weights, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search error: {str(e)}")
+    return [SearchHit(id=doc_id, label=label or "", score=score) for doc_id, label, score in hits]
+
+
+@router.get("/search/resumes", response_model=List[SearchHit])
+def search_resumes(
+    q: str = Query(..., min_length=1),
+    boosts: Optional[str] = Query(None, description="Field boosts, fields: name, skills, text"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Ranked full-text search over stored resumes."""
+    return run_search(resume_index, q, boosts, limit)
+
+
+@router.get("/search/jd", response_model=List[SearchHit])
+def search_job_descriptions(
+    q: str = Query(..., min_length=1),
+    boosts: Optional[str] = Query(None, description="Field boosts, fields: title, skills, text"),
+    limit: int = Query(20, ge=1, le=200),
+):
+    """Ranked full-text search over stored job descriptions."""
+    return run_search(jd_index, q, boosts, limit)
@@ -0,0 +1,287 @@
+"""
+Sandboxed document text extraction
+- PDF/DOCX parsing runs in separate worker processes, never in the API worker
+- Per-document CPU-time budget (RLIMIT_CPU) and address-space budget
+  (RLIMIT_AS) where available, wall-clock timeout, a resident-memory poll
+  as a fallback, and a page cap
+- A worker that hits a limit is killed and replaced; workers are also
+  recycled after a fixed number of documents
+- Limit violations surface as 422, unreadable documents as 400
+"""
+import io
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+from fastapi import HTTPException
+
+from config import settings
+
+try:
+    import resource
+except ImportError:  # Windows: only the wall-clock and memory limits apply
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+class PageLimitExceeded(Exception):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _extract_pdf_pypdf(data: bytes, max_pages: int) -> str:
+    from pypdf import PdfReader
+
+    reader = PdfReader(io.BytesIO(data))
+    if len(reader.pages) > max_pages:
+        raise PageLimitExceeded(f"document has {len(reader.pages)} pages, limit is {max_pages}")
+    return "\n".join(page.extract_text() or "" for page in reader.pages).strip()
+
+
+def _extract_pdf_pdfplumber(data: bytes, max_pages: int) -> str:
+    import pdfplumber
+
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        if len(pdf.pages) > max_pages:
+            raise PageLimitExceeded(f"document has {len(pdf.pages)} pages, limit is {max_pages}")
+        return "\n".join(page.extract_text() or "" for page in pdf.pages).strip()
+
+
+def _extract_docx(data: bytes, max_pages: int) -> str:
+    from docx_stream import iter_docx_text
+
+    return "\n".join(iter_docx_text(io.BytesIO(data))).strip()
+
+
+_EXTRACTORS = {
+    ("pdf", "pypdf"): _extract_pdf_pypdf,
+    ("pdf", "pdfplumber"): _extract_pdf_pdfplumber,
+    ("docx", "pypdf"): _extract_docx,
+    ("docx", "pdfplumber"): _extract_docx,
+}
+
+
+def _set_cpu_budget(seconds: int):
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    # The kernel sends SIGXCPU once the soft limit is crossed, which ends the worker
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _set_memory_budget(megabytes: int):
+    if resource is None or not hasattr(resource, "RLIMIT_AS"):
+        return
+    try:
+        with open("/proc/self/statm") as f:
+            current = int(f.read().split()[0]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return  # no /proc: the parent's RSS poll is the only memory limit
+    # Hard cap on address space for this document; allocations past it raise MemoryError
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = current + megabytes * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _caused_by_memory_error(exc: BaseException) -> bool:
+    # Parsers wrap errors in their own types (pdfplumber: PdfminerException)
+    while exc is not None:
+        if isinstance(exc, MemoryError):
+            return True
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def _worker_main(conn):
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        kind, engine, data, cpu_seconds, memory_mb, max_pages = job
+        try:
+            _set_cpu_budget(cpu_seconds)
+            _set_memory_budget(memory_mb)
+            text = _EXTRACTORS[(kind, engine)](data, max_pages)
+            conn.send(("ok", text))
+        except PageLimitExceeded as e:
+            conn.send(("limit", str(e)))
+        except MemoryError:
+            conn.send(("limit", "memory limit exceeded"))
+        except Exception as e:
+            if _caused_by_memory_error(e):
+                conn.send(("limit", "memory limit exceeded"))
+            else:
+                conn.send(("error", str(e)))
+
+
+# ---------------------------------------------------------------------------
+# API side
+# ---------------------------------------------------------------------------
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.jobs = 0
+
+    def rss_bytes(self):
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                return int(f.read().split()[1]) * _PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join(timeout=5)
+        self.conn.close()
+
+
+class ExtractionPool:
+    def __init__(self, max_workers: int, max_jobs_per_worker: int):
+        # spawn, so workers never inherit the API process's threads or DB connections
+        self._context = multiprocessing.get_context("spawn")
+        self._max_jobs = max_jobs_per_worker
+        self._slots = threading.BoundedSemaphore(max_workers)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> _Worker:
+        self._slots.acquire()
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.process.is_alive():
+                    return worker
+                worker.kill()
+        try:
+            return _Worker(self._context)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, worker: _Worker, healthy: bool):
+        if not healthy:
+            worker.kill()
+        elif worker.jobs >= self._max_jobs:
+            worker.stop()
+        else:
+            with self._lock:
+                self._idle.append(worker)
+        self._slots.release()
+
+    def run(self, kind: str, engine: str, data: bytes):
+        """Returns (status, payload); status is "ok", "limit" or "error"."""
+        worker = self._acquire()
+        healthy = False
+        try:
+            worker.jobs += 1
+            worker.conn.send((
+                kind, engine, data,
+                settings.SANDBOX_CPU_SECONDS, settings.SANDBOX_MEMORY_MB, settings.SANDBOX_MAX_PAGES,
+            ))
+            deadline = time.monotonic() + settings.SANDBOX_TIMEOUT_SECONDS
+            memory_limit = settings.SANDBOX_MEMORY_MB * 1024 * 1024
+            while True:
+                if worker.conn.poll(0.05):
+                    result = worker.conn.recv()
+                    # A worker that hit a limit (e.g. recovered from MemoryError) is replaced, not reused
+                    healthy = result[0] != "limit"
+                    return result
+                # RSS poll: the only memory limit where RLIMIT_AS is unavailable
+                if not worker.process.is_alive():
+                    return _exit_result(worker)
+                if time.monotonic() > deadline:
+                    return "limit", "time limit exceeded"
+                rss = worker.rss_bytes()
+                if rss is not None and rss > memory_limit:
+                    return "limit", "memory limit exceeded"
+        except EOFError:
+            return _exit_result(worker)
+        finally:
+            self._release(worker, healthy)
+
+
+def _exit_result(worker: _Worker):
+    worker.process.join(timeout=5)
+    exitcode = worker.process.exitcode
+    if hasattr(signal, "SIGXCPU") and exitcode == -signal.SIGXCPU:
+        return "limit", "CPU time limit exceeded"
+    return "error", f"extraction worker exited unexpectedly (exit code {exitcode})"
+
+
+_pool = ExtractionPool(settings.SANDBOX_WORKERS, settings.SANDBOX_MAX_JOBS_PER_WORKER)
+
+
+def _max_file_bytes() -> int:
+    return settings.SANDBOX_MAX_FILE_MB * 1024 * 1024
+
+
+def _check_size(data: bytes):
+    if len(data) > _max_file_bytes():
+        raise HTTPException(status_code=413, detail=f"File exceeds {settings.SANDBOX_MAX_FILE_MB} MB limit.")
+
+
+def read_upload(file) -> bytes:
+    """
+    Read an uploaded file object, reading at most one byte past SANDBOX_MAX_FILE_MB
+    so an oversized upload is rejected (413) without being loaded or stored.
+    """
+    data = file.read(_max_file_bytes() + 1)
+    _check_size(data)
+    return data
+
+
+async def read_upload_async(upload) -> bytes:
+    """read_upload for an UploadFile in an async endpoint."""
+    data = await upload.read(_max_file_bytes() + 1)
+    _check_size(data)
+    return data
+
+
+def extract_text(data: bytes, ext: str, engine: str = "pypdf") -> str:
+    """
+    Extract text from PDF/DOCX bytes in a sandboxed worker process.
+    engine picks the PDF library: "pypdf" (uploads) or "pdfplumber" (matcher).
+    """
+    kind = ext.lower().lstrip(".")
+    if kind not in ("pdf", "docx"):
+        raise HTTPException(status_code=400, detail="Unsupported file type. Only PDF and DOCX allowed.")
+    _check_size(data)
+
+    status, payload = _pool.run(kind, engine, data)
+    if status == "ok":
+        return payload
+    if status == "limit":
+        raise HTTPException(status_code=422, detail=f"Document exceeds processing limits: {payload}")
+    raise HTTPException(status_code=400, detail=f"{kind.upper()} extraction failed: {payload}")
@@ -0,0 +1,340 @@
+"""
+Resilient Gemini call layer
+- Per-call deadline covering all attempts
+- Jittered exponential retries on retryable errors (429 / 5xx / timeouts)
+- Optional hedged duplicate request once a call exceeds the recent latency percentile
+- Circuit breaker that fails fast while the upstream is degraded
+- Streaming variant that retries only until the first chunk arrives
+"""
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+from fastapi import HTTPException
+from google import genai
+from google.genai import errors
+from google.genai.types import HttpOptions
+
+from config import settings
+
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, lets one trial call through after the reset timeout."""
+
+    # Truthy permit returned by allow() to the caller holding the half-open trial slot
+    TRIAL = "trial"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_seconds or self._trial_in_flight:
+                return False
+            # Half-open: let a single trial request probe the upstream
+            self._trial_in_flight = True
+            return self.TRIAL
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """Give back a half-open trial slot without recording an outcome (call abandoned)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_seconds:
+                return "open"
+            return "half-open"
+
+
+class LatencyTracker:
+    """Sliding window of recent successful call latencies."""
+
+    def __init__(self, window: int):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int):
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+_executor = ThreadPoolExecutor(max_workers=settings.GEMINI_MAX_CONCURRENCY, thread_name_prefix="gemini")
+# One slot per executor thread, taken before an attempt is submitted, so calls never
+# sit in the executor queue while their per-attempt timeout is already running
+_slots = threading.BoundedSemaphore(settings.GEMINI_MAX_CONCURRENCY)
+_clients = {}
+_clients_lock = threading.Lock()
+breaker = CircuitBreaker(settings.GEMINI_BREAKER_FAILURE_THRESHOLD, settings.GEMINI_BREAKER_RESET_SECONDS)
+latencies = LatencyTracker(settings.GEMINI_LATENCY_WINDOW)
+
+
+def get_client() -> genai.Client:
+    """Return a shared Gemini client for the configured API key."""
+    api_key = os.environ.get("GEMINI_API_KEY")
+    if not api_key:
+        raise HTTPException(status_code=500, detail="GEMINI_API_KEY not set in environment variables.")
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            # The SDK timeout is in milliseconds and bounds each individual HTTP attempt
+            client = genai.Client(
+                api_key=api_key,
+                http_options=HttpOptions(
+                    timeout=int(settings.GEMINI_TIMEOUT_SECONDS * 1000),
+                    base_url=settings.GEMINI_BASE_URL or None,
+                ),
+            )
+            _clients[api_key] = client
+        return client
+
+
+# The SDK surfaces its per-attempt timeout and dropped connections as raw httpx errors
+TIMEOUT_ERRORS = (TimeoutError, httpx.TimeoutException)
+TRANSPORT_ERRORS = (ConnectionError, httpx.TransportError)
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, errors.APIError):
+        return exc.code in RETRYABLE_STATUS_CODES
+    return isinstance(exc, TIMEOUT_ERRORS + TRANSPORT_ERRORS)
+
+
+def _as_http_error(exc: Exception) -> Exception:
+    """Map a final timeout / transport failure to the gateway error the API returns."""
+    if isinstance(exc, TIMEOUT_ERRORS):
+        return HTTPException(status_code=504, detail=f"Gemini API timeout: {str(exc)}")
+    if isinstance(exc, TRANSPORT_ERRORS):
+        return HTTPException(status_code=502, detail=f"Gemini API unreachable: {str(exc)}")
+    return exc
+
+
+def _backoff(attempt: int) -> float:
+    # Full jitter: uniform in [0, min(cap, base * 2^attempt)]
+    ceiling = min(settings.GEMINI_BACKOFF_MAX_SECONDS, settings.GEMINI_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return random.uniform(0, ceiling)
+
+
+def _timed_call(client, kwargs):
+    try:
+        started = time.monotonic()
+        response = client.models.generate_content(**kwargs)
+        return response, time.monotonic() - started
+    finally:
+        _slots.release()
+
+
+def _release_if_cancelled(future):
+    if future.cancelled():
+        _slots.release()
+
+
+def _submit(client, kwargs):
+    """Submit one upstream call. The caller must hold a slot; the call gives it back."""
+    try:
+        future = _executor.submit(_timed_call, client, kwargs)
+    except BaseException:
+        _slots.release()
+        raise
+    future.add_done_callback(_release_if_cancelled)
+    return future
+
+
+def _hedged_call(client, kwargs, timeout: float):
+    """
+    Run one attempt (a slot is already held for it), firing a duplicate request
+    if the first one is slower than usual and a spare slot is free.
+    """
+    futures = [_submit(client, kwargs)]
+    deadline = time.monotonic() + timeout
+    pending = set(futures)
+    try:
+        hedge_after = None
+        if settings.GEMINI_HEDGE_PERCENTILE:
+            hedge_after = latencies.percentile(settings.GEMINI_HEDGE_PERCENTILE, settings.GEMINI_HEDGE_MIN_SAMPLES)
+        if hedge_after is not None and hedge_after < timeout:
+            done, _ = wait(futures, timeout=hedge_after)
+            # Never queue a hedge: under saturation it would only add load
+            if not done and _slots.acquire(blocking=False):
+                pending.add(_submit(client, kwargs))
+
+        last_error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                last_error = future.exception()
+        if last_error is not None and not pending:
+            raise last_error
+        raise TimeoutError(f"Gemini call exceeded {timeout:.1f}s")
+    finally:
+        # Whatever the outcome, nothing left over may still reach Gemini later
+        for other in pending:
+            other.cancel()
+
+
+def _retry_delay(e: Exception, attempt: int, deadline: float):
+    """Record the failure with the breaker; return the backoff delay, or None to give up."""
+    retryable = is_retryable(e)
+    if retryable:
+        breaker.record_failure()
+    else:
+        # Non-retryable errors (bad request, auth) say nothing about upstream health
+        breaker.record_success()
+    delay = _backoff(attempt)
+    if (
+        not retryable
+        or attempt + 1 > settings.GEMINI_MAX_RETRIES
+        or time.monotonic() + delay >= deadline
+        or not breaker.allow()
+    ):
+        return None
+    return delay
+
+
+def generate_content(**kwargs):
+    """
+    Drop-in replacement for client.models.generate_content with deadline,
+    retries, hedging and circuit breaking.
+    """
+    permit = breaker.allow()
+    if not permit:
+        raise HTTPException(status_code=503, detail="Gemini API temporarily unavailable (circuit open).")
+
+    try:
+        client = get_client()
+    except Exception:
+        if permit is CircuitBreaker.TRIAL:
+            breaker.release()
+        raise
+    deadline = time.monotonic() + settings.GEMINI_DEADLINE_SECONDS
+    attempt = 0
+    last_error = None
+    while True:
+        # Waiting for a free slot is local saturation, not upstream latency: it happens
+        # before the attempt's clock starts and is never reported to the breaker
+        if not _slots.acquire(timeout=max(0.0, deadline - time.monotonic())):
+            if permit is CircuitBreaker.TRIAL:
+                breaker.release()
+            if last_error is not None:
+                raise _as_http_error(last_error)
+            raise HTTPException(status_code=503, detail="Too many concurrent Gemini calls; try again shortly.")
+        remaining = deadline - time.monotonic()
+        try:
+            response, elapsed = _hedged_call(client, kwargs, min(remaining, settings.GEMINI_TIMEOUT_SECONDS))
+        except Exception as e:
+            # The breaker has the outcome of this attempt; any trial slot is settled
+            permit = True
+            last_error = e
+            delay = _retry_delay(e, attempt, deadline)
+            attempt += 1
+            if delay is None:
+                error = _as_http_error(e)
+                if error is e:
+                    raise
+                raise error from e
+            time.sleep(delay)
+            continue
+        latencies.record(elapsed)
+        breaker.record_success()
+        return response
+
+
+def generate_content_stream(**kwargs):
+    """
+    Streaming counterpart of generate_content: yields response chunks as they arrive.
+    Failures before the first chunk are retried like generate_content; once output
+    has started a failure is raised to the caller, which has already forwarded it.
+    Streams are not hedged, since a duplicate would run for the whole generation.
+    """
+    permit = breaker.allow()
+    if not permit:
+        raise HTTPException(status_code=503, detail="Gemini API temporarily unavailable (circuit open).")
+
+    # Whether the breaker has been told the outcome. A stream closed early (client
+    # disconnect) or failing before reaching upstream must still free a half-open
+    # trial slot, or every later call would see the circuit stuck open.
+    settled = False
+    try:
+        client = get_client()
+        deadline = time.monotonic() + settings.GEMINI_DEADLINE_SECONDS
+        attempt = 0
+        while True:
+            try:
+                stream = iter(client.models.generate_content_stream(**kwargs))
+                first = next(stream, None)
+            except Exception as e:
+                delay = _retry_delay(e, attempt, deadline)
+                permit = True  # outcome recorded; any trial slot is settled
+                attempt += 1
+                if delay is None:
+                    settled = True
+                    error = _as_http_error(e)
+                    if error is e:
+                        raise
+                    raise error from e
+                time.sleep(delay)
+                continue
+            break
+
+        try:
+            if first is not None:
+                yield first
+            for chunk in stream:
+                if time.monotonic() > deadline:
+                    raise TimeoutError("stream exceeded the call deadline")
+                yield chunk
+        except Exception as e:
+            if is_retryable(e):
+                breaker.record_failure()
+                settled = True
+            error = _as_http_error(e)
+            if error is e:
+                raise
+            raise error from e
+        breaker.record_success()
+        settled = True
+    finally:
+        if not settled and permit is CircuitBreaker.TRIAL:
+            breaker.release()
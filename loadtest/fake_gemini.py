@@ -0,0 +1,202 @@
+"""
+Fake Gemini server for offline load testing
+- Answers generateContent and streamGenerateContent (alt=sse) calls the way
+  the Gemini REST API does
+- Canned JSON for the resume, JobDescription and /resume_matcher prompts,
+  picked from the request's schema / system instruction
+- Configurable latency, jitter, slow-tail and error rate
+
+Run standalone:
+    python -m loadtest.fake_gemini --port 8090 --latency-ms 800 --error-rate 0.02
+and point the app at it with GEMINI_BASE_URL=http://127.0.0.1:8090
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RESUME_JSON = {
+    "name": "Asha Rao",
+    "location": "Bengaluru, India",
+    "education": ["B.E. Computer Science, VTU, 2019"],
+    "skills": ["Python", "FastAPI", "SQL Server", "Docker", "AWS"],
+    "email": "asha.rao@example.com",
+    "phone": "+91 98450 12345",
+    "experience": ["Backend Engineer, Acme Corp, 2019-2024"],
+    "worked_company": "Acme Corp",
+    "experience_year": 5,
+    "github_link": "https://github.com/asharao",
+    "linkedin_link": "https://www.linkedin.com/in/asharao",
+}
+
+JD_JSON = {
+    "job_title": "Backend Engineer",
+    "company_name": "Example Labs",
+    "location": "Remote",
+    "experience_required": "3+ years",
+    "qualifications": ["B.E./B.Tech in Computer Science"],
+    "responsibilities": ["Build and operate REST APIs", "Own database schema changes"],
+    "employment_type": "Full-time",
+    "primary_skills": ["Python", "FastAPI", "SQL"],
+    "secondary_skills": ["Docker", "AWS"],
+    "tertiary_skills": ["Kubernetes"],
+}
+
+MATCH_JSON = {
+    "candidate_details": {"name": "Asha Rao", "email": "asha.rao@example.com", "phone": "+91 98450 12345"},
+    "highest_education": "B.E. Computer Science",
+    "experience": ["Backend Engineer, Acme Corp, 2019-2024"],
+    "candidate_skills": ["Python", "FastAPI", "SQL Server", "Docker", "AWS"],
+    "matching_skills": ["Python", "FastAPI", "SQL", "Docker", "AWS"],
+    "unmatched_skills": ["Kubernetes"],
+    "skill_matching_percentage": 83,
+    "result": "Resume qualified successfully",
+    "summary": "Strong backend profile. Covers all primary skills. Missing only Kubernetes.",
+}
+
+
+class FakeGeminiConfig:
+    def __init__(self, latency_ms=500.0, jitter_ms=200.0, slow_rate=0.0, slow_ms=5000.0, error_rate=0.0,
+                 stream_chunks=8, first_chunk_fraction=0.2):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.slow_rate = slow_rate
+        self.slow_ms = slow_ms
+        self.error_rate = error_rate
+        self.stream_chunks = stream_chunks
+        self.first_chunk_fraction = first_chunk_fraction
+        self.requests = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def delay_seconds(self) -> float:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if self.slow_rate and random.random() < self.slow_rate:
+            delay += self.slow_ms
+        return max(delay, 0.0) / 1000.0
+
+
+def pick_canned(body: dict) -> dict:
+    """Choose the canned payload from the request's schema / system instruction."""
+    generation = body.get("generationConfig") or body.get("generation_config") or {}
+    hints = json.dumps(generation) + json.dumps(body.get("systemInstruction") or body.get("system_instruction") or "")
+    if "job_title" in hints:
+        return JD_JSON
+    if "worked_company" in hints or "linkedin_link" in hints:
+        return RESUME_JSON
+    return MATCH_JSON
+
+
+def response_payload(text: str, raw: bytes, finish_reason) -> dict:
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finish_reason:
+        candidate["finishReason"] = finish_reason
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {"promptTokenCount": len(raw) // 4, "candidatesTokenCount": len(text) // 4},
+        "modelVersion": "fake-gemini",
+    }
+
+
+def make_handler(config: FakeGeminiConfig):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send_json(self, status: int, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            raw = self.rfile.read(length) if length else b"{}"
+            path = self.path.split("?", 1)[0]
+            streaming = path.endswith(":streamGenerateContent")
+            if not streaming and not path.endswith(":generateContent"):
+                self._send_json(404, {"error": {"code": 404, "message": "not found", "status": "NOT_FOUND"}})
+                return
+
+            with config.lock:
+                config.requests += 1
+            delay = config.delay_seconds()
+            # Streams answer after a short time-to-first-chunk and spread the rest over the chunks
+            time.sleep(delay * config.first_chunk_fraction if streaming else delay)
+
+            if config.error_rate and random.random() < config.error_rate:
+                with config.lock:
+                    config.errors += 1
+                status, name = random.choice([(429, "RESOURCE_EXHAUSTED"), (503, "UNAVAILABLE")])
+                self._send_json(status, {"error": {"code": status, "message": "fake upstream error", "status": name}})
+                return
+
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                body = {}
+            text = json.dumps(pick_canned(body))
+            if streaming:
+                self._send_stream(text, raw, delay * (1 - config.first_chunk_fraction))
+                return
+            self._send_json(200, response_payload(text, raw, "STOP"))
+
+        def _send_stream(self, text: str, raw: bytes, remaining_delay: float):
+            # alt=sse framing, as used by the SDK's generate_content_stream
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            size = max(1, -(-len(text) // config.stream_chunks))
+            pieces = [text[i:i + size] for i in range(0, len(text), size)]
+            for index, piece in enumerate(pieces):
+                if index:
+                    time.sleep(remaining_delay / max(1, len(pieces) - 1))
+                finish = "STOP" if index == len(pieces) - 1 else None
+                event = json.dumps(response_payload(piece, raw, finish))
+                try:
+                    self.wfile.write(f"data: {event}\r\n\r\n".encode("utf-8"))
+                    self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    return  # client closed the stream early
+
+    return Handler
+
+
+def start_server(config: FakeGeminiConfig, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the fake server on a background thread; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-gemini", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Gemini server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency-ms", type=float, default=500.0)
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of calls given extra latency")
+    parser.add_argument("--slow-ms", type=float, default=5000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered 429/503")
+    args = parser.parse_args()
+
+    config = FakeGeminiConfig(args.latency_ms, args.jitter_ms, args.slow_rate, args.slow_ms, args.error_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    print(f"Fake Gemini listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
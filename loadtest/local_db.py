@@ -0,0 +1,109 @@
+"""
+Local SQLite stand-in for the SQL Server schema (DB_BACKEND=sqlite)
+- Mirrors the tables in resume_validater.sql that the app touches
+- Seeds the roles and a load-test user
+"""
+import sqlite3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Roles (
+    RoleId INTEGER PRIMARY KEY AUTOINCREMENT,
+    RoleName TEXT NOT NULL UNIQUE,
+    Description TEXT,
+    CreatedAt TEXT DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS Users (
+    UserId INTEGER PRIMARY KEY AUTOINCREMENT,
+    Username TEXT NOT NULL UNIQUE,
+    PasswordHash TEXT NOT NULL,
+    Email TEXT UNIQUE,
+    FirstName TEXT,
+    LastName TEXT,
+    IsActive INTEGER DEFAULT 1,
+    CreatedAt TEXT DEFAULT CURRENT_TIMESTAMP,
+    UpdatedAt TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS UserRoles (
+    UserRoleId INTEGER PRIMARY KEY AUTOINCREMENT,
+    UserId INTEGER NOT NULL REFERENCES Users(UserId) ON DELETE CASCADE,
+    RoleId INTEGER NOT NULL REFERENCES Roles(RoleId) ON DELETE CASCADE,
+    AssignedAt TEXT DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (UserId, RoleId)
+);
+
+CREATE TABLE IF NOT EXISTS job_descriptions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_title TEXT NOT NULL,
+    company_name TEXT,
+    location TEXT,
+    experience_required TEXT,
+    qualifications TEXT,
+    responsibilities TEXT,
+    employment_type TEXT,
+    primary_skills TEXT,
+    secondary_skills TEXT,
+    tertiary_skills TEXT,
+    jd_file_path TEXT NOT NULL,
+    jd_text TEXT,
+    created_by INTEGER,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    updated_by INTEGER,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS resume_checker (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT,
+    location TEXT,
+    education TEXT,
+    skills TEXT,
+    email TEXT,
+    phone TEXT,
+    experience TEXT,
+    worked_company TEXT,
+    experience_year INTEGER,
+    github_link TEXT,
+    linkedin_link TEXT,
+    resume_text TEXT,
+    file_key TEXT
+);
+
+CREATE TABLE IF NOT EXISTS resume_minhash (
+    resume_id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL,
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+ROLES = [
+    ("Admin", "Administrator with full system access"),
+    ("User", "Standard user with basic application access"),
+    ("Moderator", "Content moderator with specific permissions"),
+]
+
+
+def init_db(path: str, username: str, password_hash: str):
+    """Create the schema and seed roles plus one user (idempotent)."""
+    conn = sqlite3.connect(path)
+    try:
+        # WAL lets the app's readers run alongside the upload writers
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT OR IGNORE INTO Roles (RoleName, Description) VALUES (?, ?)", ROLES)
+        conn.execute(
+            "INSERT OR IGNORE INTO Users (Username, PasswordHash, Email, FirstName, LastName) VALUES (?, ?, ?, ?, ?)",
+            (username, password_hash, f"{username}@example.com", "Load", "Test"),
+        )
+        conn.execute(
+            """
+            INSERT OR IGNORE INTO UserRoles (UserId, RoleId)
+            SELECT U.UserId, R.RoleId FROM Users U, Roles R WHERE U.Username = ? AND R.RoleName = 'User'
+            """,
+            (username,),
+        )
+        conn.commit()
+    finally:
+        conn.close()
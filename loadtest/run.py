@@ -0,0 +1,299 @@
+"""
+End-to-end load test, fully offline
+- Starts the fake Gemini server and a SQLite stand-in for SQL Server
+- Boots the FastAPI app under uvicorn against them, in a scratch directory
+- Drives a weighted mix of /token, uploads, /resume_matcher/ and listing calls
+- Reports throughput and latency percentiles per scenario
+
+Example (from the repository root):
+    python -m loadtest.run --duration 60 --concurrency 32 \\
+        --mix token=1,upload_resume=2,matcher=3,list_resumes=3,list_jd=1 \\
+        --latency-ms 800 --error-rate 0.02
+"""
+import argparse
+import glob
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from loadtest.fake_gemini import FakeGeminiConfig, start_server
+from loadtest.local_db import init_db
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USERNAME = "loadtest"
+PASSWORD = "loadtest-password"
+DEFAULT_MIX = "token=1,upload_resume=2,upload_jd=1,matcher=3,list_resumes=3,list_jd=1"
+
+
+def load_fixtures(pattern: str):
+    paths = sorted(glob.glob(pattern, recursive=True))
+    return [(os.path.basename(p), open(p, "rb").read()) for p in paths]
+
+
+class Scenarios:
+    def __init__(self, base_url: str, resumes, jds):
+        self.base_url = base_url
+        self.resumes = resumes
+        self.jds = jds
+
+    def token(self, session):
+        return session.post(f"{self.base_url}/token", data={"username": USERNAME, "password": PASSWORD})
+
+    def upload_resume(self, session):
+        name, data = random.choice(self.resumes)
+        return session.post(f"{self.base_url}/upload-resume", files={"file": (name, data, "application/pdf")})
+
+    def upload_jd(self, session):
+        name, data = random.choice(self.jds)
+        return session.post(f"{self.base_url}/upload-jd", files={"file": (name, data, "application/pdf")})
+
+    def matcher(self, session):
+        resume_name, resume_data = random.choice(self.resumes)
+        jd_name, jd_data = random.choice(self.jds)
+        files = {
+            "resume": (resume_name, resume_data, "application/pdf"),
+            "jd": (jd_name, jd_data, "application/pdf"),
+        }
+        return session.post(f"{self.base_url}/resume_matcher/", files=files)
+
+    def matcher_stream(self, session):
+        resume_name, resume_data = random.choice(self.resumes)
+        jd_name, jd_data = random.choice(self.jds)
+        files = {
+            "resume": (resume_name, resume_data, "application/pdf"),
+            "jd": (jd_name, jd_data, "application/pdf"),
+        }
+        response = session.post(f"{self.base_url}/resume_matcher/stream", files=files, stream=True)
+        # Read the whole stream; an "error" event counts with the status code it carries
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: ") and event == "error":
+                response.status_code = json.loads(line[len("data: "):]).get("status_code", 500)
+        return response
+
+    def list_resumes(self, session):
+        return session.get(f"{self.base_url}/resumes")
+
+    def list_jd(self, session):
+        return session.get(f"{self.base_url}/jd")
+
+    def search(self, session):
+        return session.get(f"{self.base_url}/search/resumes", params={"q": "python backend"})
+
+
+def parse_mix(mix: str):
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if not hasattr(Scenarios, name) or name.startswith("_"):
+            raise SystemExit(f"Unknown scenario '{name}'")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(ordered, pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def drive(scenarios: Scenarios, weights, duration: float, concurrency: int, timeout: float):
+    names = list(weights)
+    cumulative = [weights[n] for n in names]
+    results = defaultdict(list)  # scenario -> [(latency, status)]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        session = requests.Session()
+        session.request = _with_timeout(session.request, timeout)
+        local = defaultdict(list)
+        while time.monotonic() < deadline:
+            name = random.choices(names, weights=cumulative)[0]
+            started = time.perf_counter()
+            try:
+                status = getattr(scenarios, name)(session).status_code
+            except requests.RequestException:
+                status = 0
+            local[name].append((time.perf_counter() - started, status))
+        with lock:
+            for name, samples in local.items():
+                results[name].extend(samples)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return results, time.monotonic() - started
+
+
+def _with_timeout(request, timeout):
+    def wrapped(*args, **kwargs):
+        kwargs.setdefault("timeout", timeout)
+        return request(*args, **kwargs)
+    return wrapped
+
+
+def summarize(results, elapsed: float):
+    rows = []
+    all_latencies = []
+    total = errors = 0
+    for name in sorted(results):
+        samples = results[name]
+        latencies = sorted(s[0] for s in samples)
+        failed = sum(1 for _, status in samples if not 200 <= status < 300)
+        statuses = defaultdict(int)
+        for _, status in samples:
+            statuses[status] += 1
+        rows.append({
+            "scenario": name,
+            "requests": len(samples),
+            "errors": failed,
+            "rps": round(len(samples) / elapsed, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+            "p90_ms": round(percentile(latencies, 90) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            "max_ms": round((latencies[-1] if latencies else 0) * 1000, 1),
+            "status_codes": dict(sorted(statuses.items())),
+        })
+        all_latencies.extend(latencies)
+        total += len(samples)
+        errors += failed
+    all_latencies.sort()
+    overall = {
+        "scenario": "TOTAL",
+        "requests": total,
+        "errors": errors,
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(all_latencies, 50) * 1000, 1),
+        "p90_ms": round(percentile(all_latencies, 90) * 1000, 1),
+        "p95_ms": round(percentile(all_latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(all_latencies, 99) * 1000, 1),
+        "max_ms": round((all_latencies[-1] if all_latencies else 0) * 1000, 1),
+    }
+    return rows, overall
+
+
+def print_report(rows, overall, elapsed, gemini_config):
+    columns = ["scenario", "requests", "errors", "rps", "p50_ms", "p90_ms", "p95_ms", "p99_ms", "max_ms"]
+    print(f"\nDuration: {elapsed:.1f}s")
+    print("  ".join(f"{c:>14}" for c in columns))
+    for row in rows + [overall]:
+        print("  ".join(f"{row[c]:>14}" for c in columns))
+    for row in rows:
+        print(f"  {row['scenario']}: status codes {row['status_codes']}")
+    print(f"Fake Gemini: {gemini_config.requests} calls, {gemini_config.errors} injected errors")
+
+
+def wait_until_ready(base_url: str, process, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"App exited during startup (exit code {process.returncode})")
+        try:
+            if requests.get(f"{base_url}/openapi.json", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise SystemExit("App did not become ready in time")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end load test")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent virtual users")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted scenario mix, name=weight,...")
+    parser.add_argument("--app-port", type=int, default=8765)
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--request-timeout", type=float, default=120.0)
+    parser.add_argument("--resumes", default=os.path.join(REPO_ROOT, "resume_uploads", "**", "*.pdf"))
+    parser.add_argument("--jds", default=os.path.join(REPO_ROOT, "jd_uploads", "**", "*.pdf"))
+    parser.add_argument("--no-match-cache", action="store_true", help="disable the /resume_matcher cache")
+    parser.add_argument("--latency-ms", type=float, default=500.0, help="fake Gemini base latency")
+    parser.add_argument("--jitter-ms", type=float, default=200.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=5000.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json-out", help="also write the report as JSON to this file")
+    parser.add_argument("--keep-workdir", action="store_true")
+    args = parser.parse_args()
+
+    weights = parse_mix(args.mix)
+    resumes, jds = load_fixtures(args.resumes), load_fixtures(args.jds)
+    if not resumes or not jds:
+        raise SystemExit("No PDF fixtures found; pass --resumes / --jds glob patterns")
+
+    workdir = tempfile.mkdtemp(prefix="resume-loadtest-")
+    db_path = os.path.join(workdir, "loadtest.sqlite3")
+
+    # auth pulls in the app's hashing setup; import after argument parsing so --help stays fast
+    sys.path.insert(0, REPO_ROOT)
+    from auth import get_password_hash
+    init_db(db_path, USERNAME, get_password_hash(PASSWORD))
+
+    gemini_config = FakeGeminiConfig(args.latency_ms, args.jitter_ms, args.slow_rate, args.slow_ms, args.error_rate)
+    gemini_server = start_server(gemini_config)
+    gemini_url = f"http://127.0.0.1:{gemini_server.server_address[1]}"
+
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": REPO_ROOT + os.pathsep + env.get("PYTHONPATH", ""),
+        "DB_BACKEND": "sqlite",
+        "DB_SQLITE_PATH": db_path,
+        "GEMINI_BASE_URL": gemini_url,
+        "GEMINI_API_KEY": "fake-key",
+        "MATCH_CACHE_PATH": os.path.join(workdir, "match_cache.sqlite3"),
+    })
+    if args.no_match_cache:
+        env["MATCH_CACHE_MAX_ENTRIES"] = "0"
+
+    base_url = f"http://127.0.0.1:{args.app_port}"
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.app_port),
+         "--workers", str(args.app_workers), "--log-level", "warning"],
+        cwd=workdir,
+        env=env,
+    )
+    try:
+        wait_until_ready(base_url, app)
+        print(f"App ready at {base_url}; fake Gemini at {gemini_url}; "
+              f"{args.concurrency} users for {args.duration:.0f}s, mix {weights}")
+        results, elapsed = drive(Scenarios(base_url, resumes, jds), weights, args.duration,
+                                 args.concurrency, args.request_timeout)
+        rows, overall = summarize(results, elapsed)
+        print_report(rows, overall, elapsed, gemini_config)
+        if args.json_out:
+            with open(args.json_out, "w") as f:
+                json.dump({"elapsed_seconds": elapsed, "scenarios": rows, "total": overall,
+                           "gemini_calls": gemini_config.requests, "gemini_errors": gemini_config.errors}, f, indent=2)
+    finally:
+        app.terminate()
+        try:
+            app.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            app.kill()
+        gemini_server.shutdown()
+        if args.keep_workdir:
+            print(f"Work directory kept at {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Persistent cache for /resume_matcher results
+- Keyed by (resume content hash, JD content hash, model, prompt version)
+- Stored in a local SQLite file so it survives restarts
+- Size-bounded LRU eviction and TTL expiry
+- Tracks hit/miss stats
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config import settings
+
+
+class MatchCache:
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS match_cache (
+                cache_key TEXT PRIMARY KEY,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS IX_match_cache_last_access ON match_cache (last_access)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(resume_bytes: bytes, jd_bytes: bytes, model: str, prompt_version: str) -> str:
+        """Build the cache key from the raw file contents and the LLM settings."""
+        resume_hash = hashlib.sha256(resume_bytes).hexdigest()
+        jd_hash = hashlib.sha256(jd_bytes).hexdigest()
+        return f"{resume_hash}:{jd_hash}:{model}:{prompt_version}"
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the cached match result, or None on miss / expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM match_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self._misses += 1
+                return None
+            if self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                self._conn.execute("DELETE FROM match_cache WHERE cache_key = ?", (key,))
+                self._conn.commit()
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE match_cache SET last_access = ? WHERE cache_key = ?", (now, key)
+            )
+            self._conn.commit()
+            self._hits += 1
+            return json.loads(row[0])
+
+    def set(self, key: str, result) -> None:
+        """Store a match result and evict least recently used entries over the limit."""
+        now = time.time()
+        payload = json.dumps(result)
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO match_cache (cache_key, result, created_at, last_access)
+                VALUES (?, ?, ?, ?)
+                """,
+                (key, payload, now, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM match_cache").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    """
+                    DELETE FROM match_cache WHERE cache_key IN (
+                        SELECT cache_key FROM match_cache ORDER BY last_access ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+                self._evictions += overflow
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM match_cache").fetchone()[0]
+            lookups = self._hits + self._misses
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
+
+
+match_cache = MatchCache(
+    settings.MATCH_CACHE_PATH,
+    settings.MATCH_CACHE_MAX_ENTRIES,
+    settings.MATCH_CACHE_TTL_SECONDS,
+)
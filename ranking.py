@@ -0,0 +1,159 @@
+"""
+Vectorized resume ranking for a stored JD
+- Resumes are sparse binary rows over skill phrases and skill terms
+- A JD becomes a weighted query vector (primary > secondary > tertiary skills),
+  normalised so a resume covering every JD skill scores 1.0
+- Top-k for a JD is a single sparse matrix-vector product
+- New resumes are appended to the CSR arrays on insert and scored from a small
+  tail matrix; the full matrix is rebuilt only once the tail outgrows
+  RANK_REBUILD_FRACTION of it
+- Each worker also catches up on rows written by other workers (by id)
+"""
+import json
+import re
+import threading
+import time
+from array import array
+from typing import Dict, List, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from database import IdWatermark, execute_query
+from config import settings
+
+_TERM_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(_TERM_RE.findall((skill or "").lower()))
+
+
+def skill_features(skill: str) -> Tuple[str, List[str]]:
+    """Phrase feature plus its term features, so "Python 3" still partially matches "Python"."""
+    phrase = normalize_skill(skill)
+    return f"skill:{phrase}", [f"term:{t}" for t in phrase.split()]
+
+
+class ResumeRanker:
+    def __init__(self, tier_weights: Dict[str, float], term_weight: float):
+        self.tier_weights = tier_weights
+        self.term_weight = term_weight
+        self._lock = threading.Lock()
+        self._vocabulary: Dict[str, int] = {}
+        self._resume_ids = array("q")
+        self._labels: List[str] = []
+        self._known = set()
+        # CSR components, grown in place as resumes are added
+        self._indptr = array("i", [0])
+        self._indices = array("i")
+        # CSR over the first _base_rows rows; later rows live only in the arrays above
+        self._base = None
+        self._base_rows = 0
+        self._watermark = IdWatermark(settings.INDEX_REFRESH_GRACE_SECONDS)
+        self._last_refresh = 0.0
+
+    def _column(self, feature: str) -> int:
+        column = self._vocabulary.get(feature)
+        if column is None:
+            column = len(self._vocabulary)
+            self._vocabulary[feature] = column
+        return column
+
+    def _add(self, resume_id: int, skills: List[str], label: str):
+        if resume_id in self._known:
+            return
+        columns = set()
+        for skill in skills or []:
+            phrase, terms = skill_features(skill)
+            if phrase == "skill:":
+                continue
+            columns.add(self._column(phrase))
+            columns.update(self._column(t) for t in terms)
+        self._indices.extend(sorted(columns))
+        self._indptr.append(len(self._indices))
+        self._resume_ids.append(resume_id)
+        self._labels.append(label or "")
+        self._known.add(resume_id)
+
+    def add(self, resume_id: int, skills: List[str], label: str = ""):
+        with self._lock:
+            self._add(resume_id, skills, label)
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._last_refresh and now - self._last_refresh < settings.SEARCH_REFRESH_SECONDS:
+            return
+        where, params = self._watermark.predicate("id")
+        rows = execute_query(f"SELECT id, name, skills FROM resume_checker WHERE {where} ORDER BY id", params)
+        for resume_id, name, skills in rows or []:
+            self._add(resume_id, json.loads(skills) if skills else [], name)
+            self._watermark.mark_loaded(resume_id)
+        self._last_refresh = now
+
+    def _csr(self, start: int, stop: int) -> csr_matrix:
+        """CSR for rows [start, stop); copies, so the source arrays can keep growing."""
+        indptr = np.frombuffer(self._indptr, dtype=np.int32)[start:stop + 1].copy()
+        lo, hi = int(indptr[0]), int(indptr[-1])
+        indices = np.frombuffer(self._indices, dtype=np.int32)[lo:hi].copy() if self._indices else np.zeros(0, np.int32)
+        return csr_matrix(
+            (np.ones(len(indices), dtype=np.float32), indices, indptr - lo),
+            shape=(stop - start, len(self._vocabulary)),
+        )
+
+    def _scores(self, vector: np.ndarray) -> np.ndarray:
+        rows = len(self._resume_ids)
+        if self._base is None or rows - self._base_rows > settings.RANK_REBUILD_FRACTION * self._base_rows:
+            self._base = self._csr(0, rows)
+            self._base_rows = rows
+        # Columns added since the base was built have no entries in it
+        scores = self._base @ vector[:self._base.shape[1]]
+        if rows > self._base_rows:
+            scores = np.concatenate([scores, self._csr(self._base_rows, rows) @ vector])
+        return scores
+
+    def jd_vector(self, tiers: Dict[str, List[str]]) -> np.ndarray:
+        """Weighted, normalised query vector; features no resume has only count toward the total."""
+        vector = np.zeros(len(self._vocabulary), dtype=np.float32)
+        total = 0.0
+        for tier, skills in tiers.items():
+            weight = self.tier_weights.get(tier, 0.0)
+            for skill in skills or []:
+                phrase, terms = skill_features(skill)
+                if phrase == "skill:":
+                    continue
+                features = [(phrase, weight)]
+                features += [(t, weight * self.term_weight / len(terms)) for t in terms]
+                for feature, value in features:
+                    total += value
+                    column = self._vocabulary.get(feature)
+                    if column is not None:
+                        vector[column] += value
+        if total:
+            vector /= total
+        return vector
+
+    def top_k(self, tiers: Dict[str, List[str]], k: int) -> List[Tuple[int, str, float]]:
+        with self._lock:
+            self._refresh()
+            if not self._resume_ids:
+                return []
+            scores = self._scores(self.jd_vector(tiers))
+            k = min(k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [
+                (self._resume_ids[i], self._labels[i], round(float(scores[i]), 4))
+                for i in top
+                if scores[i] > 0
+            ]
+
+
+resume_ranker = ResumeRanker(
+    tier_weights={
+        "primary": settings.RANK_PRIMARY_WEIGHT,
+        "secondary": settings.RANK_SECONDARY_WEIGHT,
+        "tertiary": settings.RANK_TERTIARY_WEIGHT,
+    },
+    term_weight=settings.RANK_TERM_WEIGHT,
+)
@@ -72,3 +72,20 @@ CREATE TABLE job_descriptions (
     updated_by int FOREIGN KEY REFERENCES users(userid) , -- User or system that last updated the entry
     updated_at DATETIME DEFAULT GETDATE() -- Timestamp of last update
 );
+
+
+-- MinHash signatures of resume text, used for near-duplicate detection
+CREATE TABLE resume_minhash (
+    resume_id INT PRIMARY KEY, -- id of the row in resume_checker
+    signature VARBINARY(MAX) NOT NULL, -- packed MinHash signature
+    created_at DATETIME DEFAULT GETDATE()
+);
+
+
+-- Extracted document text, indexed for full-text (BM25) search
+ALTER TABLE resume_checker ADD resume_text NVARCHAR(MAX) NULL;
+ALTER TABLE job_descriptions ADD jd_text NVARCHAR(MAX) NULL;
+
+-- Blob key ("<sha256><ext>") of the uploaded resume in the content-addressed store;
+-- job_descriptions.jd_file_path holds the same kind of key for JDs
+ALTER TABLE resume_checker ADD file_key NVARCHAR(100) NULL;
@@ -0,0 +1,209 @@
+"""
+BM25 full-text search over stored resume and JD text
+- Per-field inverted index with compact array postings (doc numbers + term frequencies)
+- Field-weighted BM25 scoring with per-query boosts, vectorized with numpy over
+  each posting list into a dense score array; top-k via argpartition
+- Documents are added incrementally on insert; each worker also catches up
+  on rows written by other workers (by id) before searching
+"""
+import json
+import math
+import re
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from database import IdWatermark, execute_query
+from config import settings
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or that the to was were will with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    if not text:
+        return []
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, fields: Sequence[str], k1: float = 1.2, b: float = 0.75):
+        self.fields = tuple(fields)
+        self.k1 = k1
+        self.b = b
+        self._doc_ids = array("q")       # doc number -> external id
+        self._labels: List[str] = []     # doc number -> display label
+        self._doc_numbers: Dict[int, int] = {}
+        # field -> term -> (doc numbers, term frequencies); appended to in place and
+        # read through zero-copy numpy views (np.frombuffer) at search time
+        self._postings = {f: defaultdict(lambda: (array("i"), array("H"))) for f in self.fields}
+        self._lengths = {f: array("I") for f in self.fields}
+        self._total_length = {f: 0 for f in self.fields}
+        # field -> (average length used, per-document denominators)
+        self._denominator_cache: Dict[str, Tuple[float, array]] = {}
+
+    def __len__(self):
+        return len(self._doc_ids)
+
+    def __contains__(self, doc_id: int):
+        return doc_id in self._doc_numbers
+
+    def add(self, doc_id: int, fields: Dict[str, str], label: str = ""):
+        if doc_id in self._doc_numbers:
+            return
+        number = len(self._doc_ids)
+        self._doc_ids.append(doc_id)
+        self._labels.append(label or "")
+        self._doc_numbers[doc_id] = number
+        for field in self.fields:
+            tokens = tokenize(fields.get(field) or "")
+            self._lengths[field].append(len(tokens))
+            self._total_length[field] += len(tokens)
+            self._extend_denominators(field, len(tokens))
+            postings = self._postings[field]
+            for term, tf in Counter(tokens).items():
+                numbers, freqs = postings[term]
+                numbers.append(number)
+                freqs.append(min(tf, 0xFFFF))
+
+    def search(self, query: str, boosts: Dict[str, float], limit: int) -> List[Tuple[int, str, float]]:
+        terms = set(tokenize(query))
+        total_docs = len(self._doc_ids)
+        if not terms or not total_docs:
+            return []
+
+        # Views over the array postings must not outlive this call: an array that is
+        # exporting its buffer cannot be appended to by add()
+        scores = np.zeros(total_docs, dtype=np.float32)
+        for field in self.fields:
+            boost = boosts.get(field, 0.0)
+            if boost <= 0 or not self._total_length[field]:
+                continue
+            postings = self._postings[field]
+            denominators = np.frombuffer(self._denominators(field), dtype=np.float64)
+            for term in terms:
+                entry = postings.get(term)
+                if entry is None:
+                    continue
+                numbers = np.frombuffer(entry[0], dtype=np.int32)
+                freqs = np.frombuffer(entry[1], dtype=np.uint16).astype(np.float32)
+                df = len(numbers)
+                weight = boost * math.log(1 + (total_docs - df + 0.5) / (df + 0.5)) * (self.k1 + 1)
+                # A document appears at most once per posting list, so plain fancy-index
+                # accumulation is safe (no np.add.at needed)
+                scores[numbers] += weight * freqs / (freqs + denominators[numbers])
+
+        if limit < total_docs:
+            candidates = np.argpartition(scores, total_docs - limit)[total_docs - limit:]
+        else:
+            candidates = np.arange(total_docs)
+        candidates = candidates[scores[candidates] > 0]
+        # Highest score first, ties by insertion order
+        top = candidates[np.lexsort((candidates, -scores[candidates]))]
+        return [(self._doc_ids[n], self._labels[n], round(float(scores[n]), 4)) for n in top.tolist()]
+
+    def _denominators(self, field: str) -> array:
+        """Per-document length normalisation k1 * (1 - b + b * len / avg_len)."""
+        cached = self._denominator_cache.get(field)
+        if cached is not None:
+            return cached[1]
+        avg_length = self._total_length[field] / len(self._doc_ids)
+        k1, b = self.k1, self.b
+        denominators = array("d", (k1 * (1 - b + b * length / avg_length) for length in self._lengths[field]))
+        self._denominator_cache[field] = (avg_length, denominators)
+        return denominators
+
+    def _extend_denominators(self, field: str, length: int):
+        # Keep the cache on incremental adds; rebuild only once the average
+        # document length has drifted by more than 1%
+        cached = self._denominator_cache.get(field)
+        if cached is None:
+            return
+        avg_length, denominators = cached
+        current = self._total_length[field] / len(self._doc_ids)
+        if not avg_length or abs(current - avg_length) > 0.01 * avg_length:
+            del self._denominator_cache[field]
+            return
+        denominators.append(self.k1 * (1 - self.b + self.b * length / avg_length))
+
+
+class DocumentIndex:
+    """BM25 index kept in sync with one database table."""
+
+    def __init__(
+        self,
+        load_query: str,
+        row_to_doc: Callable[[tuple], Tuple[int, Dict[str, str], str]],
+        fields: Sequence[str],
+        default_boosts: Dict[str, float],
+    ):
+        self.load_query = load_query
+        self.row_to_doc = row_to_doc
+        self.default_boosts = default_boosts
+        self.index = BM25Index(fields)
+        self._lock = threading.Lock()
+        self._watermark = IdWatermark(settings.INDEX_REFRESH_GRACE_SECONDS)
+        self._last_refresh = 0.0
+
+    def _refresh(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._last_refresh < settings.SEARCH_REFRESH_SECONDS:
+            return
+        where, params = self._watermark.predicate("id")
+        rows = execute_query(self.load_query.format(where=where), params)
+        for row in rows or []:
+            doc_id, fields, label = self.row_to_doc(row)
+            self.index.add(doc_id, fields, label)
+            self._watermark.mark_loaded(doc_id)
+        self._last_refresh = now
+
+    def add(self, doc_id: int, fields: Dict[str, str], label: str = ""):
+        with self._lock:
+            self.index.add(doc_id, fields, label)
+
+    def search(self, query: str, boosts: Optional[Dict[str, float]] = None, limit: int = 20):
+        weights = dict(self.default_boosts)
+        weights.update(boosts or {})
+        with self._lock:
+            self._refresh(force=self._last_refresh == 0.0)
+            return self.index.search(query, weights, limit)
+
+
+def _join_list(value) -> str:
+    if not value:
+        return ""
+    try:
+        return " ".join(json.loads(value))
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def _resume_row(row):
+    return row[0], {"name": row[1], "skills": _join_list(row[2]), "text": row[3]}, row[1]
+
+
+def _jd_row(row):
+    skills = " ".join(_join_list(v) for v in row[2:5])
+    return row[0], {"title": row[1], "skills": skills, "text": row[5]}, row[1]
+
+
+resume_index = DocumentIndex(
+    "SELECT id, name, skills, resume_text FROM resume_checker WHERE {where} ORDER BY id",
+    _resume_row,
+    fields=("name", "skills", "text"),
+    default_boosts={"name": 2.0, "skills": 3.0, "text": 1.0},
+)
+
+jd_index = DocumentIndex(
+    "SELECT id, job_title, primary_skills, secondary_skills, tertiary_skills, jd_text "
+    "FROM job_descriptions WHERE {where} ORDER BY id",
+    _jd_row,
+    fields=("title", "skills", "text"),
+    default_boosts={"title": 3.0, "skills": 2.0, "text": 1.0},
+)